@@ -18,7 +18,9 @@ directly: it will be imported automatically with the top level module.
 from __future__ import print_function
 
 from os.path import exists as path_exists, isabs, isdir, join as path_join
-from os import listdir
+from os import listdir, stat
+from functools import lru_cache
+from time import time
 import logging
 import string
 
@@ -100,6 +102,9 @@ FORMAT_KEYS = [
     FMT_OS_VERSION_ID,
 ]
 
+#: Window within which a directory mtime is too recent to trust (seconds).
+_RACY_MTIME = 2
+
 #: Root options for Stratis root file systems
 ROOT_OPTS_STRATIS = "stratis.rootfs.pool_uuid=%{stratis_pool_uuid}"
 
@@ -896,6 +901,10 @@ def blank_or_comment(line):
     return not line.strip() or line.lstrip().startswith("#")
 
 
+#: Characters permitted in the name of a name/value pair.
+_VALID_NAME_CHARS = frozenset(string.ascii_letters + string.digits + "_-,.'\"")
+
+
 def parse_name_value(nvp, separator="=", allow_empty=False):
     """Parse a name value pair string.
 
@@ -911,20 +920,19 @@ def parse_name_value(nvp, separator="=", allow_empty=False):
     :returns: A ``(name, value)`` tuple.
     :rtype: (string, string) tuple.
     """
-    val_err = ValueError("Malformed name/value pair: %s" % nvp)
     try:
         # Only strip newlines: values may contain embedded
         # whitespace anywhere within the string.
         name, value = nvp.rstrip("\n").split(separator, 1)
     except ValueError:
         if not allow_empty or not nvp:
-            raise val_err
+            raise ValueError("Malformed name/value pair: %s" % nvp)
         name = nvp.strip(separator)
         value = None
 
     # Value cannot start with '='
     if value and value.startswith("="):
-        raise val_err
+        raise ValueError("Malformed name/value pair: %s" % nvp)
 
     name = name.strip()
     value = value.lstrip() if value else None
@@ -932,9 +940,8 @@ def parse_name_value(nvp, separator="=", allow_empty=False):
     if value and "#" in value:
         value, comment = value.split("#", 1)
 
-    valid_name_chars = string.ascii_letters + string.digits + "_-,.'\""
-    bad_chars = [c for c in name if c not in valid_name_chars]
-    if any(bad_chars):
+    if not _VALID_NAME_CHARS.issuperset(name):
+        bad_chars = [c for c in name if c not in _VALID_NAME_CHARS]
         raise ValueError("Invalid characters in name: %s (%s)" % (name, bad_chars))
 
     if value:
@@ -957,20 +964,38 @@ def find_minimum_sha_prefix(shas, min_prefix):
     :returns: The minimum unique prefix length for the set
     :rtype: int
     """
-    shas = list(shas)
-    shas.sort()
-    for sha in shas:
-        if shas.index(sha) == len(shas) - 1:
-            continue
-
-        def _next_sha(shas, sha):
-            return shas[shas.index(sha) + 1]
-
-        while sha[:min_prefix] == _next_sha(shas, sha)[:min_prefix]:
+    shas = sorted(shas)
+    # In sorted order the longest common prefix of any value is shared
+    # with one of its neighbours: only adjacent pairs need comparing.
+    for sha, next_sha in zip(shas, shas[1:]):
+        while sha[:min_prefix] == next_sha[:min_prefix]:
             min_prefix += 1
     return min_prefix
 
 
+def min_id_widths(min_prefix, objs, attrs):
+    """Calculate the minimum unique widths for several id attributes.
+
+    Calculate the minimum width to ensure uniqueness when displaying
+    the values of each attribute in ``attrs``, collecting the values
+    for all attributes in a single pass over ``objs``.
+
+    :param min_prefix: The minimum allowed unique prefix.
+    :param objs: An iterable containing objects to check.
+    :param attrs: A list of attribute names to compare.
+
+    :returns: A dictionary mapping attribute names to widths.
+    :rtype: dict
+    """
+    ids = dict((attr, set()) for attr in attrs)
+    for obj in objs or []:
+        for attr in attrs:
+            ids[attr].add(getattr(obj, attr))
+    return dict(
+        (attr, find_minimum_sha_prefix(ids[attr], min_prefix)) for attr in attrs
+    )
+
+
 def min_id_width(min_prefix, objs, attr):
     """Calculate the minimum unique width for id values.
 
@@ -987,10 +1012,40 @@ def min_id_width(min_prefix, objs, attr):
     if not objs:
         return min_prefix
 
-    ids = set()
-    for obj in objs:
-        ids.add(getattr(obj, attr))
-    return find_minimum_sha_prefix(ids, min_prefix)
+    return min_id_widths(min_prefix, objs, [attr])[attr]
+
+
+def _scan_profile_files(profiles_path, profile_ext):
+    """Return the names of profile files found in ``profiles_path``.
+
+    Return a tuple of the file names in ``profiles_path`` that end
+    with the extension ``profile_ext``.
+
+    :param profiles_path: Path to the on-disk profile directory.
+    :param profile_ext: Extension of profile files.
+    :returns: A tuple of profile file names.
+    :rtype: tuple
+    """
+    suffix = ".%s" % profile_ext
+    return tuple(pf for pf in listdir(profiles_path) if pf.endswith(suffix))
+
+
+@lru_cache(maxsize=16)
+def _list_profile_files(profiles_path, profile_ext, mtime):
+    """Return the names of profile files found in ``profiles_path``.
+
+    Cached form of ``_scan_profile_files()``, keyed on the path,
+    extension, and directory modification time: callers pass the
+    current ``st_mtime_ns`` of ``profiles_path`` so that any change
+    to the directory contents forces a re-scan.
+
+    :param profiles_path: Path to the on-disk profile directory.
+    :param profile_ext: Extension of profile files.
+    :param mtime: The modification time of ``profiles_path`` in ns.
+    :returns: A tuple of profile file names.
+    :rtype: tuple
+    """
+    return _scan_profile_files(profiles_path, profile_ext)
 
 
 def load_profiles_for_class(profile_class, profile_type, profiles_path, profile_ext):
@@ -1016,16 +1071,25 @@ def load_profiles_for_class(profile_class, profile_type, profiles_path, profile_
 
     :returns: None
     """
-    profile_files = listdir(profiles_path)
+    st = stat(profiles_path)
+    if time() - st.st_mtime < _RACY_MTIME:
+        # The directory may change again without its mtime changing
+        # if it was modified within the timestamp granularity of the
+        # file system: bypass the cache for recently modified paths.
+        profile_files = _scan_profile_files(profiles_path, profile_ext)
+    else:
+        profile_files = _list_profile_files(profiles_path, profile_ext, st.st_mtime_ns)
     _log_debug("Loading %s profiles from %s" % (profile_type, profiles_path))
+
+    # Bind globals used in the loop body to locals.
+    _join = path_join
+    _warn = _log_warn
     for pf in profile_files:
-        if not pf.endswith(".%s" % profile_ext):
-            continue
-        pf_path = path_join(profiles_path, pf)
+        pf_path = _join(profiles_path, pf)
         try:
             profile_class(profile_file=pf_path)
         except Exception as e:
-            _log_warn(
+            _warn(
                 "Failed to load %s from '%s': %s" % (profile_class.__name__, pf_path, e)
             )
             if get_debug_mask():
@@ -1096,6 +1160,7 @@ __all__ = [
     "parse_btrfs_subvol",
     "find_minimum_sha_prefix",
     "min_id_width",
+    "min_id_widths",
     "load_profiles_for_class",
 ]
 
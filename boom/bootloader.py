@@ -42,8 +42,8 @@ from __future__ import print_function
 from os.path import basename, exists as path_exists, join as path_join
 from subprocess import Popen, PIPE
 from tempfile import mkstemp
-from os import listdir, rename, fdopen, chmod, unlink, fdatasync, stat, dup
-from stat import S_ISBLK
+from os import scandir, replace, fdopen, fchmod, fstat, unlink, fdatasync, stat
+from stat import S_IMODE, S_ISBLK
 from hashlib import sha1
 import logging
 
@@ -61,6 +61,12 @@ BOOT_ENTRIES_FORMAT = "%s-%s-%s.conf"
 
 #: A regular expression matching the boom file name format.
 BOOT_ENTRIES_PATTERN = r"(\w*)-([0-9a-f]{7,})-.*\.conf"
+_BOOT_ENTRIES_RE = re.compile(BOOT_ENTRIES_PATTERN)
+
+#: A regular expression matching an ``OsIdentifier`` comment line.
+_OS_ID_COMMENT_RE = re.compile(
+    r"^[ \t]*#[ \t]*OsIdentifier:[ \t]*(\S+)[ \t]*(?:\n|$)", re.MULTILINE
+)
 
 #: The file mode with which BLS entries should be created.
 BOOT_ENTRY_MODE = 0o644
@@ -214,6 +220,16 @@ _log_error = _log.error
 #: The global list of boot entries.
 _entries = None
 
+#: The Grub2 environment read by ``_grub2_get_env()``, or ``None`` if the
+#: environment has not been read since entries were last dropped.
+_grub2_env = None
+
+#: Generation counter for the loaded entries and their boot_id values.
+_entries_generation = 0
+
+#: The entries generation and minimum unique boot_id width last computed.
+_boot_id_width = (None, 7)
+
 #: Pattern for forming root device paths from LVM2 names.
 DEV_PATTERN = "/dev/%s"
 
@@ -253,6 +269,28 @@ def check_root_device(dev):
         raise BoomRootDeviceError("Path '%s' is not a block device." % dev)
 
 
+def _dm_split_name(name):
+    """Split a device-mapper LVM2 name into volume group and logical
+    volume components.
+
+    The components are separated by the first single hyphen that
+    follows the first character of ``name``: doubled hyphens are
+    escaped hyphens that form part of a name, and are returned
+    unchanged.
+
+    :param name: A device-mapper name in "vg-lv" notation.
+    :returns: A ``(vg, lv)`` tuple, or ``None`` if ``name`` contains
+              no separator.
+    :rtype: tuple
+    """
+    i = name.find("-", 1)
+    while i > 0:
+        if name[i - 1] != "-" and name[i + 1 : i + 2] != "-":
+            return (name[0:i], name[i + 1 :])
+        i = name.find("-", i + 1)
+    return None
+
+
 def _match_root_lv(root_device, rd_lvm_lv):
     """Return ``True`` if ``rd_lvm_lv`` is the logical volume
     represented by ``root_device`` or ``False`` otherwise.
@@ -264,19 +302,12 @@ def _match_root_lv(root_device, rd_lvm_lv):
         root_device=/dev/vg/lv
 
     """
-
-    def dm_split_name(name):
-        for i in range(1, len(name)):
-            if name[i] == "-":
-                if name[i - 1] != "-" and name[i + 1] != "-":
-                    return (name[0:i], name[i + 1 :])
-
     # root_device=/dev/vg/lv
     if rd_lvm_lv == root_device[5:]:
         return True
     if "mapper" in root_device:
-        (vg, lv) = dm_split_name(root_device.split("/")[-1])
-        if rd_lvm_lv == "%s/%s" % (vg, lv):
+        vg_lv = _dm_split_name(root_device.split("/")[-1])
+        if vg_lv and rd_lvm_lv == "%s/%s" % vg_lv:
             return True
     return False
 
@@ -285,23 +316,32 @@ def _grub2_get_env(name):
     """Return the value of the Grub2 environment variable with name
     ``name`` as a string.
 
+    The environment is read once with ``grub2-editenv`` and cached
+    until ``drop_entries()`` is called.
+
     :param name: The name of the environment variable to return.
     :returns: The value of the named environment variable.
     :rtype: string
     """
-    grub_cmd = ["grub2-editenv", "list"]
-    try:
-        p = Popen(grub_cmd, stdin=None, stdout=PIPE, stderr=PIPE)
-        out = p.communicate()[0]
-    except OSError as e:
-        _log_error("Could not obtain grub2 environment: %s" % e)
-        return ""
+    global _grub2_env
+    if _grub2_env is None:
+        _grub2_env = {}
+        grub_cmd = ["grub2-editenv", "list"]
+        try:
+            p = Popen(grub_cmd, stdin=None, stdout=PIPE, stderr=PIPE)
+            out = p.communicate()[0]
+        except OSError as e:
+            _log_error("Could not obtain grub2 environment: %s" % e)
+            return ""
+
+        for line in out.decode("utf8").splitlines():
+            (env_name, _, value) = line.partition("=")
+            _grub2_env[env_name] = value.strip()
+    return _grub2_env.get(name, "")
 
-    for line in out.decode("utf8").splitlines():
-        (env_name, value) = line.split("=", 1)
-        if name == env_name:
-            return value.strip()
-    return ""
+
+#: A whitespace-delimited Grub2 environment variable reference.
+_GRUB2_VAR_RE = re.compile(r"(?<!\S)%s(\S+)" % re.escape(GRUB2_EXPAND_ENV))
 
 
 def _expand_vars(args):
@@ -309,15 +349,30 @@ def _expand_vars(args):
     references to Grub2 environment variables using shell
     style ``$value`` notation.
     """
-    var_char = GRUB2_EXPAND_ENV
-    if var_char not in args:
+    if GRUB2_EXPAND_ENV not in args:
         return args
 
-    for arg in args.split():
-        if arg.startswith(var_char):
-            env_name = arg[1:]
-            args = args.replace(arg, _grub2_get_env(env_name))
-    return args
+    return _GRUB2_VAR_RE.sub(lambda m: _grub2_get_env(m.group(1)), args)
+
+
+#: Optional boot parameter option names: these are only templated when the
+#: corresponding ``BootParams`` value is set.
+_OPTIONAL_BP_OPTS = frozenset(
+    ("rootflags", "rd.lvm.lv", "subvol", "subvolid", "stratis.rootfs.pool_uuid")
+)
+
+#: Keyword argument formats for ``BootParams`` string representations.
+_BP_FMT = "%s=%s, "
+_BP_FMT_QUOTED = '%s="%s", '
+
+#: Optional ``BootParams`` keyword arguments in string representations.
+_BP_KW_FIELDS = (
+    "root_device",
+    "lvm_root_lv",
+    "btrfs_subvol_path",
+    "btrfs_subvol_id",
+    "stratis_pool_uuid",
+)
 
 
 class BootParams(object):
@@ -330,32 +385,20 @@ class BootParams(object):
     attached OsProfile.
     """
 
-    #: The kernel version of the instance.
-    _version = None
-
-    #: The path to the root device
-    _root_device = None
-
-    #: The LVM2 logical volume containing the root file system
-    _lvm_root_lv = None
-
-    #: The BTRFS subvolume path to be used as the root file system.
-    _btrfs_subvol_path = None
-
-    #: The ID of the BTRFS subvolume to be used as the root file system.
-    _btrfs_subvol_id = None
-
-    #: The UUID of the Stratis pool containing the root_device.
-    _stratis_pool_uuid = None
-
-    #: A list of additional kernel options to append
-    _add_opts = []
-
-    #: A list of kernel options to drop
-    _del_opts = []
-
-    #: Generation counter for dirty detection
-    generation = 0
+    __slots__ = (
+        "_version",
+        "_root_device",
+        "_lvm_root_lv",
+        "_btrfs_subvol_path",
+        "_btrfs_subvol_id",
+        "_stratis_pool_uuid",
+        "_stratis_root_device",
+        "_is_stratis",
+        "_stratis_root_uuid",
+        "_add_opts",
+        "_del_opts",
+        "generation",
+    )
 
     def __str(self, quote=False, prefix="", suffix=""):
         """Format BootParams as a string.
@@ -371,35 +414,17 @@ class BootParams(object):
         :returns: a formatted representation of this ``BootParams``.
         :rtype: string
         """
-        bp_str = prefix
-
-        fields = [
-            "version",
-            "root_device",
-            "lvm_root_lv",
-            "btrfs_subvol_path",
-            "btrfs_subvol_id",
-            "stratis_pool_uuid",
-        ]
-        params = (
-            self.root_device,
-            self.lvm_root_lv,
-            self.btrfs_subvol_path,
-            self.btrfs_subvol_id,
-            self.stratis_pool_uuid,
-        )
-
         # arg
-        bp_str += self.version if not quote else '"%s"' % self.version
-        bp_str += ", "
+        parts = [prefix, self.version if not quote else '"%s"' % self.version, ", "]
 
         # kwargs
+        bp_fmt = _BP_FMT if not quote else _BP_FMT_QUOTED
+        for field in _BP_KW_FIELDS:
+            value = getattr(self, field)
+            if value:
+                parts.append(bp_fmt % (field, value))
 
-        bp_fmt = "%s=%s, " if not quote else '%s="%s", '
-        for fv in [fv for fv in zip(fields[1:], params) if fv[1]]:
-            bp_str += bp_fmt % fv
-
-        return bp_str.rstrip(", ") + suffix
+        return "".join(parts).rstrip(", ") + suffix
 
     def __str__(self):
         """Format BootParams as a human-readable string.
@@ -483,6 +508,31 @@ class BootParams(object):
         :rtype: class BootParams
         :raises: ValueError
         """
+        #: The kernel version of the instance.
+        self._version = None
+        #: The path to the root device
+        self._root_device = None
+        #: The LVM2 logical volume containing the root file system
+        self._lvm_root_lv = None
+        #: The BTRFS subvolume path to be used as the root file system.
+        self._btrfs_subvol_path = None
+        #: The ID of the BTRFS subvolume to be used as the root file system.
+        self._btrfs_subvol_id = None
+        #: The UUID of the Stratis pool containing the root_device.
+        self._stratis_pool_uuid = None
+        #: The root_device value checked by the last call to has_stratis()
+        self._stratis_root_device = None
+        #: The result of the last call to has_stratis()
+        self._is_stratis = False
+        #: The pool UUID looked up for the last Stratis root_device
+        self._stratis_root_uuid = None
+        #: A list of additional kernel options to append
+        self._add_opts = []
+        #: A list of kernel options to drop
+        self._del_opts = []
+        #: Generation counter for dirty detection
+        self.generation = 0
+
         if not version:
             raise ValueError("version argument is required.")
 
@@ -512,7 +562,7 @@ class BootParams(object):
         self.add_opts = add_opts or []
         self.del_opts = del_opts or []
 
-        _log_debug_entry("Initialised %s" % repr(self))
+        _log_debug_entry("Initialised %r", self)
 
     # We have to use explicit properties for BootParam attributes since
     # we need to track modifications to the BootParams values to allow
@@ -526,7 +576,8 @@ class BootParams(object):
     @version.setter
     def version(self, value):
         """Set this ``BootParams`` object's version."""
-        self.generation += 1
+        if value != self._version:
+            self.generation += 1
         self._version = value
 
     @property
@@ -537,7 +588,8 @@ class BootParams(object):
     @root_device.setter
     def root_device(self, value):
         """Set this ``BootParams`` object's root_device."""
-        self.generation += 1
+        if value != self._root_device:
+            self.generation += 1
         self._root_device = value
 
     @property
@@ -548,7 +600,8 @@ class BootParams(object):
     @lvm_root_lv.setter
     def lvm_root_lv(self, value):
         """Set this ``BootParams`` object's lvm_root_lv."""
-        self.generation += 1
+        if value != self._lvm_root_lv:
+            self.generation += 1
         self._lvm_root_lv = value
 
     @property
@@ -559,7 +612,8 @@ class BootParams(object):
     @btrfs_subvol_path.setter
     def btrfs_subvol_path(self, value):
         """Set this ``BootParams`` object's btrfs_subvol_path."""
-        self.generation += 1
+        if value != self._btrfs_subvol_path:
+            self.generation += 1
         self._btrfs_subvol_path = value
 
     @property
@@ -570,7 +624,8 @@ class BootParams(object):
     @btrfs_subvol_id.setter
     def btrfs_subvol_id(self, value):
         """Set this ``BootParams`` object's btrfs_subvol_id."""
-        self.generation += 1
+        if value != self._btrfs_subvol_id:
+            self.generation += 1
         self._btrfs_subvol_id = value
 
     @property
@@ -579,13 +634,18 @@ class BootParams(object):
         if self._stratis_pool_uuid:
             return self._stratis_pool_uuid
         if self.has_stratis():
-            return format_pool_uuid(symlink_to_pool_uuid(self.root_device))
+            # Cached with the has_stratis() result for this root_device.
+            if self._stratis_root_uuid is None:
+                uuid = format_pool_uuid(symlink_to_pool_uuid(self.root_device))
+                self._stratis_root_uuid = uuid
+            return self._stratis_root_uuid
         return ""
 
     @stratis_pool_uuid.setter
     def stratis_pool_uuid(self, value):
         """Override this ``BootParams`` object's stratis_pool_uuid."""
-        self.generation += 1
+        if value != self._stratis_pool_uuid:
+            self.generation += 1
         self._stratis_pool_uuid = value
 
     @property
@@ -596,7 +656,10 @@ class BootParams(object):
     @add_opts.setter
     def add_opts(self, value):
         """Set this ``BootParams`` object's add_opts."""
-        self.generation += 1
+        # A list modified in place and assigned again compares equal to
+        # itself: treat re-assignment of the same list as a change.
+        if value is self._add_opts or value != self._add_opts:
+            self.generation += 1
         self._add_opts = value
 
     @property
@@ -607,7 +670,8 @@ class BootParams(object):
     @del_opts.setter
     def del_opts(self, value):
         """Set this ``BootParams`` object's del_opts."""
-        self.generation += 1
+        if value is self._del_opts or value != self._del_opts:
+            self.generation += 1
         self._del_opts = value
 
     def has_btrfs(self):
@@ -636,9 +700,16 @@ class BootParams(object):
                   otherwise.
         :rtype: bool
         """
-        if self.root_device is None:
+        root_device = self.root_device
+        if root_device is None:
             return False
-        return is_stratis_device_path(self.root_device)
+        # Checking a Stratis device path queries stratisd via D-Bus:
+        # cache the result for the current root_device value.
+        if root_device != self._stratis_root_device:
+            self._is_stratis = is_stratis_device_path(root_device)
+            self._stratis_root_device = root_device
+            self._stratis_root_uuid = None
+        return self._is_stratis
 
     @classmethod
     def from_entry(cls, be, expand=False):
@@ -665,36 +736,48 @@ class BootParams(object):
         # Version is written directly from BootParams
         version = be.version
         bp = BootParams(version)
-        matches = {}
+        matches = set()
 
-        opts_regexes = osp.make_format_regexes(osp.options)
+        opts_regexes = osp.compiled_format_regexes(osp.options)
         if not opts_regexes:
             return None
 
         _log_debug_entry(
-            "Matching options regex list with %d entries" % len(opts_regexes)
+            "Matching options regex list with %d entries", len(opts_regexes)
         )
-        _log_debug_entry("Options regex list: %s" % str(opts_regexes))
+        if _log.isEnabledFor(logging.DEBUG):
+            _log_debug_entry(
+                "Options regex list: %s", str([r[0:2] for r in opts_regexes])
+            )
+
+        # The expanded options do not change while matching: split them
+        # once rather than once per regex.
+        words = be.expand_options.split()
 
         for rgx_word in opts_regexes:
-            (name, exp) = rgx_word
+            (name, exp, rgx, literal) = rgx_word
             value = ""
-            for word in be.expand_options.split():
-                match = re.search(exp, word) if name else re.match(exp, word)
+            for word in words:
+                # Words lacking the expression's literal text cannot match.
+                if literal not in word:
+                    continue
+                match = rgx.search(word) if name else rgx.match(word)
                 if match:
                     if len(match.groups()):
                         value = match.group(1)
-                        _log_debug_entry("Matching: '%s' (%s)" % (value, name))
+                        _log_debug_entry("Matching: '%s' (%s)", value, name)
                     if name == "lvm_root_lv":
                         if not _match_root_lv(bp.root_device, value):
                             continue
                         _log_debug_entry(
-                            "Matched root_device=%s to %s=%s"
-                            % (bp.root_device, name, value)
+                            "Matched root_device=%s to %s=%s",
+                            bp.root_device,
+                            name,
+                            value,
                         )
-                    matches[word] = True
+                    matches.add(word)
                     if name:
-                        _log_debug_entry("Matched %s=%s" % (name, value))
+                        _log_debug_entry("Matched %s=%s", name, value)
                         setattr(bp, name, value)
 
             # The root_device key is handled specially since it is required
@@ -703,6 +786,10 @@ class BootParams(object):
                 _log_warn("No root_device for entry at %s" % be._last_path)
                 setattr(bp, name, "")
 
+        be_options = be.options
+        profile_opts = set(osp.options.split())
+        expanded_opts = None
+
         def is_add(opt):
             """Return ``True`` if ``opt`` was appended to this options line,
             and was not generated from the active ``OsProfile`` template,
@@ -719,14 +806,18 @@ class BootParams(object):
                           environment variable, or ``False`` otherwise.
                 :rtype: bool
                 """
-                if GRUB2_EXPAND_ENV not in be.options:
+                nonlocal expanded_opts
+                if GRUB2_EXPAND_ENV not in be_options:
                     return False
-                return opt not in _expand_vars(be.options).split()
+                # Expand the options at most once per entry.
+                if expanded_opts is None:
+                    expanded_opts = set(_expand_vars(be_options).split())
+                return opt not in expanded_opts
 
-            if opt not in matches.keys():
-                if opt not in be._osp.options.split():
+            if opt not in matches:
+                if opt not in profile_opts:
                     if not opt_in_expansion(opt):
-                        _log_debug_entry("Found add_opt: %s" % opt)
+                        _log_debug_entry("Found add_opt: %s", opt)
                         return True
             return False
 
@@ -744,21 +835,14 @@ class BootParams(object):
             templating operations.
             """
             # Ignore optional boot parameters
-            ignore_bp = [
-                "rootflags",
-                "rd.lvm.lv",
-                "subvol",
-                "subvolid",
-                "stratis.rootfs.pool_uuid",
-            ]
             opt_name = opt.split("=")[0]
-            matched_opts = [k.split("=")[0] for k in matches.keys()]
-            if opt_name not in matched_opts and opt_name not in ignore_bp:
-                _log_debug_entry("Found del_opt: %s" % opt)
+            if opt_name not in matched_opts and opt_name not in _OPTIONAL_BP_OPTS:
+                _log_debug_entry("Found del_opt: %s", opt)
                 return True
             return False
 
-        options = be.expand_options.split() if expand else be.options.split()
+        options = words if expand else be_options.split()
+        matched_opts = {k.split("=")[0] for k in matches}
 
         # Compile list of unique non-template options
         bp.add_opts = [opt for opt in options if is_add(opt)]
@@ -766,11 +850,21 @@ class BootParams(object):
         # Compile list of deleted template options
         bp.del_opts = [o for o in [r[1] for r in opts_regexes] if is_del(o)]
 
-        _log_debug_entry("Parsed %s" % repr(bp))
+        _log_debug_entry("Parsed %r", bp)
 
         return bp
 
 
+def _entries_changed():
+    """Advance the generation counter of the loaded entries.
+
+    Called when an entry is added to or removed from the list of
+    loaded entries, and when the boot_id of an entry changes.
+    """
+    global _entries_generation
+    _entries_generation += 1
+
+
 def _add_entry(entry):
     """Add a new entry to the list of loaded on-disk entries.
 
@@ -779,8 +873,12 @@ def _add_entry(entry):
     global _entries
     if _entries is None:
         load_entries()
-    if entry not in _entries:
+    # Equivalent to "entry not in _entries", without the per-entry
+    # BootEntry.__eq__() calls.
+    boot_id = entry.boot_id
+    if not any(be is entry or be.boot_id == boot_id for be in _entries):
         _entries.append(entry)
+        _entries_changed()
 
 
 def _del_entry(entry):
@@ -789,19 +887,25 @@ def _del_entry(entry):
     :param entry: The ``BootEntry`` to remove.
     """
     global _entries
+    if _entries is None:
+        return
     _entries.remove(entry)
+    _entries_changed()
 
 
 def drop_entries():
     """Drop all in-memory entries.
 
     Clear the list of in-memory entries and reset the BootEntry
-    list to the default state.
+    list to the default state. The cached Grub2 environment is
+    also discarded, and is read again on next use.
 
     :returns: None
     """
-    global _entries
-    _entries = []
+    global _entries, _grub2_env
+    _entries = None
+    _grub2_env = None
+    _entries_changed()
 
 
 def load_entries(machine_id=None):
@@ -821,23 +925,52 @@ def load_entries(machine_id=None):
     entries_path = boom_entries_path()
 
     drop_entries()
+    _entries = []
 
-    _log_debug("Loading boot entries from '%s'" % entries_path)
-    for entry in listdir(entries_path):
-        if not entry.endswith(".conf"):
-            continue
-        if machine_id and machine_id not in entry:
-            _log_debug_entry("Skipping entry with machine_id!='%s'", machine_id)
-            continue
-        entry_path = path_join(entries_path, entry)
+    # The boot_id of an entry cannot change while entries are being
+    # loaded: track the set of loaded ids to avoid a linear scan of the
+    # entry list for each new entry.
+    boot_ids = set()
+
+    _log_debug("Loading boot entries from '%s'", entries_path)
+    # Scan the directory once and close it before loading entries: an
+    # entry may be renamed by write_entry() while it is being loaded.
+    entry_paths = []
+    # Entry file names begin with the machine_id: test the name before
+    # the file type so that other machines' entries are rejected first.
+    with scandir(entries_path) as it:
+        for entry in it:
+            if not entry.name.endswith(".conf"):
+                continue
+            if machine_id and not entry.name.startswith(machine_id):
+                _log_debug_entry("Skipping entry with machine_id!='%s'", machine_id)
+                continue
+            # is_file() uses the cached directory entry type where the
+            # file system provides one, avoiding a stat() per entry.
+            if not entry.is_file():
+                continue
+            entry_paths.append(entry.path)
+
+    for entry_path in entry_paths:
         try:
-            _add_entry(BootEntry(entry_file=entry_path))
+            be = BootEntry(entry_file=entry_path)
         except Exception as e:
             _log_info("Could not load BootEntry '%s': %s" % (entry_path, e))
             if get_debug_mask():
                 raise e
+            continue
+        if be.boot_id in boot_ids:
+            continue
+        boot_ids.add(be.boot_id)
+        # An entry whose file name does not match its boot_id is renamed
+        # by update_entry() while it is constructed, and write_entry()
+        # then adds it to _entries: do not add a renamed entry twice.
+        if be._last_path != entry_path and any(e is be for e in _entries):
+            continue
+        _entries.append(be)
 
-    _log_debug("Loaded %d entries" % len(_entries))
+    _entries_changed()
+    _log_debug("Loaded %d entries", len(_entries))
 
 
 def write_entries():
@@ -847,7 +980,10 @@ def write_entries():
     ``boom.bootloader.boom_entries_path()``.
     """
     global _entries
-    for be in _entries:
+    for be in _entries or []:
+        # Unmodified entries are already on disk.
+        if not be._unwritten:
+            continue
         try:
             be.write_entry()
         except Exception as e:
@@ -865,7 +1001,13 @@ def min_boot_id_width():
     :returns: the minimum boot_id width.
     :rtype: int
     """
-    return min_id_width(7, _entries, "boot_id")
+    global _boot_id_width
+    if _boot_id_width[0] != _entries_generation:
+        # Reading boot_id values may regenerate them and advance the
+        # generation: record the generation after the ids are read.
+        boot_ids = {be.boot_id for be in _entries or []}
+        _boot_id_width = (_entries_generation, find_minimum_sha_prefix(boot_ids, 7))
+    return _boot_id_width[1]
 
 
 def select_params(s, bp):
@@ -893,6 +1035,22 @@ def select_params(s, bp):
     return True
 
 
+#: Selection attributes tested by ``select_entry()`` and ``select_params()``
+_ENTRY_SELECT_ATTRS = (
+    "boot_id",
+    "title",
+    "version",
+    "machine_id",
+    "linux",
+    "initrd",
+    "path",
+    "root_device",
+    "lvm_root_lv",
+    "btrfs_subvol_path",
+    "btrfs_subvol_id",
+)
+
+
 def select_entry(s, be):
     """Test BootEntry against Selection criteria.
 
@@ -906,17 +1064,20 @@ def select_entry(s, be):
     :returns: True if BootEntry passes selection or ``False``
               otherwise.
     """
-    if not select_profile(s, be._osp):
+    # Test the plain entry data and the cached boot_id before criteria
+    # that may require profile templates to be expanded.
+    if s.machine_id and be.machine_id != s.machine_id:
+        return False
+    if s.version and be.version != s.version:
         return False
-
     if s.boot_id and not be.boot_id.startswith(s.boot_id):
         return False
     if s.title and be.title != s.title:
         return False
-    if s.version and be.version != s.version:
-        return False
-    if s.machine_id and be.machine_id != s.machine_id:
+
+    if not select_profile(s, be._osp):
         return False
+
     if s.linux and be.linux != s.linux:
         return False
     if s.initrd and be.initrd != s.initrd:
@@ -950,23 +1111,32 @@ def find_entries(selection=None):
     """
     global _entries
 
-    if not _entries:
+    # An empty list means that entries were loaded and none were found.
+    if _entries is None:
         load_entries()
 
-    matches = []
-
     # Use null search criteria if unspecified
     selection = selection if selection else Selection()
 
     selection.check_valid_selection(entry=True, params=True, profile=True)
 
-    _log_debug_entry("Finding entries for %s" % repr(selection))
+    _log_debug_entry("Finding entries for %r", selection)
+
+    entries = _entries
+    # A boot_id prefix selects at most a few entries and is tested
+    # against the cached boot_id: narrow the candidates before the full
+    # per-entry tests.
+    if selection.boot_id:
+        boot_id = selection.boot_id
+        entries = [be for be in entries if be.boot_id.startswith(boot_id)]
 
-    for be in _entries:
-        if select_entry(selection, be):
-            matches.append(be)
+    if any(getattr(selection, attr) for attr in _ENTRY_SELECT_ATTRS):
+        matches = [be for be in entries if select_entry(selection, be)]
+    else:
+        # Only profile criteria apply: skip the per-entry tests.
+        matches = [be for be in entries if select_profile(selection, be._osp)]
 
-    _log_debug_entry("Found %d entries" % len(matches))
+    _log_debug_entry("Found %d entries", len(matches))
     return matches
 
 
@@ -1002,6 +1172,194 @@ def _transform_key(key_name):
     return key_name
 
 
+#: Ordered ``(key, attribute, BLS key)`` tuples for each ``BootEntry`` key.
+_ENTRY_ATTRS = tuple((k, KEY_MAP[k], _transform_key(KEY_MAP[k])) for k in ENTRY_KEYS)
+
+#: Templated keys reported by ``BootEntry.keys()`` without and with
+#: ``BootParams``.
+_ADD_KEYS = (BOOM_ENTRY_LINUX, BOOM_ENTRY_INITRD, BOOM_ENTRY_OPTIONS)
+_ADD_KEYS_BP = _ADD_KEYS + (BOOM_ENTRY_VERSION,)
+
+#: Map each accepted on-disk BLS key name to the corresponding Boom key.
+_BLS_KEY_MAP = {
+    name: MAP_KEY[_transform_key(name)]
+    for attr in MAP_KEY
+    for name in (attr, attr.replace("_", "-"))
+    if _transform_key(name) in MAP_KEY
+}
+
+
+def _append_opts(opts, append):
+    """Append additional kernel options to an options string.
+
+    Format the elements of list ``append`` as a space separated
+    string, and return them appended to the existing options
+    string ``opts``.
+
+    :param opts: A kernel command line options string.
+    :param append: A list of additional options to append.
+    :returns: A string with additional options appended.
+    :rtype: string
+    """
+    extra = " ".join(append)
+    return f"{opts} {extra}" if append else opts
+
+
+def _drop_opt(opt, drop):
+    """Return ``True`` if option ``opt`` should be dropped or
+    ``False`` otherwise.
+
+    Test the option ``opt`` against the drop specification ``drop``
+    and return ``True`` if the option should be dropped according
+    to the spec, or ``False`` otherwise.
+
+    :param opt: A kernel command line option with or without value.
+    :param drop: A drop specification in Boom del_opts notation
+                 (see ``del_opts`` for further details of syntax).
+    :returns: ``True`` if the option should be dropped or ``False``
+              otherwise.
+    :rtype: bool
+    """
+    # "name" or "name=value"
+    if opt in drop:
+        return True
+
+    # "name=" wildcard
+    if ("%s=" % opt.split("=")[0]) in drop:
+        return True
+    return False
+
+
+def _drop_opts(opts, drop):
+    """Remove template-supplied kernel options matching ``drop`` from
+    options string ``opts``.
+
+    A drop specification matches either a simple name, a name and
+    its full value (in which case both must match), or a name,
+    followed by '=', indicating that an option with value should
+    be dropped regardless of the actual value:
+
+    <name>         drop name
+    <name>=        drop name and any value
+    <name>=<value> drop name only if its value == value
+
+    :param opts: A kernel command line options string.
+    :param drop: A drop specification to apply to ``opts``.
+    :returns: A kernel command line options string with options
+              matching ``drop`` removed.
+    :rtype: string
+    """
+    if not drop:
+        return " ".join(opts.split())
+    return " ".join([o for o in opts.split() if not _drop_opt(o, drop)])
+
+
+# Table-driven key formatting for ``BootEntry._apply_format()``
+#
+# Each entry in the _FORMAT_KEY_SPECS table specifies a list of possible
+# key substitutions to perform for the named key. Each entry of the
+# key_spec list contains a dictionary containing one or more attribute
+# sources or predicates.
+#
+# A key substitution is evaluated if at least one of the listed
+# attribute sources is defined, and if all defined predicates evaluate
+# to True. A predicate is the name of a ``BootParams`` method accepting
+# no arguments and returning a boolean: predicates are ignored if the
+# entry has no ``BootParams``. The "needs" key documents the object that
+# must exist for the substitution to be meaningful.
+#
+# Keys are substituted in table order: a value substituted for one key
+# may itself contain a later key (for e.g. the %{btrfs_root_opts}
+# template containing %{btrfs_subvolume}).
+
+# Key spec constants
+_BE_ATTR = "be_attr"
+_BP_ATTR = "bp_attr"
+_OSP_ATTR = "osp_attr"
+_PRED_FN = "pred_fn"
+_VAL_FMT = "val_fmt"
+_NEEDS = "needs"
+
+_FORMAT_KEY_SPECS = tuple(
+    ("%%{%s}" % key_name, key_specs)
+    for key_name, key_specs in (
+        (FMT_VERSION, [{_BE_ATTR: "version", _BP_ATTR: "version"}]),
+        (FMT_LVM_ROOT_LV, [{_BP_ATTR: "lvm_root_lv"}]),
+        (FMT_LVM_ROOT_OPTS, [{_OSP_ATTR: "root_opts_lvm2"}]),
+        (FMT_BTRFS_ROOT_OPTS, [{_OSP_ATTR: "root_opts_btrfs"}]),
+        (
+            FMT_BTRFS_SUBVOLUME,
+            [
+                {
+                    _BP_ATTR: "btrfs_subvol_id",
+                    _NEEDS: "bp",
+                    _PRED_FN: ("has_btrfs",),
+                    _VAL_FMT: "subvolid=%s",
+                },
+                {
+                    _BP_ATTR: "btrfs_subvol_path",
+                    _NEEDS: "bp",
+                    _PRED_FN: ("has_btrfs",),
+                    _VAL_FMT: "subvol=%s",
+                },
+            ],
+        ),
+        (
+            FMT_STRATIS_POOL_UUID,
+            [
+                {
+                    _BP_ATTR: "stratis_pool_uuid",
+                    _NEEDS: "bp",
+                    _PRED_FN: ("has_stratis",),
+                }
+            ],
+        ),
+        (FMT_ROOT_DEVICE, [{_BP_ATTR: "root_device", _NEEDS: "bp"}]),
+        (FMT_ROOT_OPTS, [{_BE_ATTR: "root_opts", _NEEDS: "bp"}]),
+        (FMT_KERNEL, [{_BE_ATTR: "linux", _NEEDS: "bp"}]),
+        (FMT_INITRAMFS, [{_BE_ATTR: "initrd", _NEEDS: "bp"}]),
+        (FMT_OS_NAME, [{_OSP_ATTR: "os_name"}]),
+        (FMT_OS_SHORT_NAME, [{_OSP_ATTR: "os_short_name"}]),
+        (FMT_OS_VERSION, [{_OSP_ATTR: "os_version"}]),
+        (FMT_OS_VERSION_ID, [{_OSP_ATTR: "os_version_id"}]),
+    )
+)
+
+
+# Keys for derived property values stored in the BootEntry format cache
+# alongside formatted strings: tuples cannot collide with format strings.
+_CACHE_ROOT_OPTS = ("root_opts",)
+_CACHE_OPTIONS = ("options",)
+
+
+def _format_key_value(key_spec, be, bp, osp):
+    """Return a key's value attribute.
+
+    Return a value from either `BootParams`, `OsProfile`, or
+    `BootEntry`. Each source is tested in order and the value is
+    taken from the first object type with a value for the named key.
+
+    :param key_spec: The key specification to evaluate.
+    :param be: The ``BootEntry`` being formatted.
+    :param bp: The ``BootParams`` attached to ``be``, or ``None``.
+    :param osp: The profile attached to ``be``, or ``None``.
+    :returns: The formatted value, or ``None`` if no source for the
+              key is available.
+    """
+    if _BP_ATTR in key_spec and bp:
+        value = getattr(bp, key_spec[_BP_ATTR])
+    elif _OSP_ATTR in key_spec and osp is not None:
+        value = getattr(osp, key_spec[_OSP_ATTR])
+    elif _BE_ATTR in key_spec:
+        value = getattr(be, key_spec[_BE_ATTR])
+    else:
+        return None
+    if value is None:
+        return None
+    val_fmt = key_spec.get(_VAL_FMT)
+    return val_fmt % value if val_fmt else str(value)
+
+
 class BootEntry(object):
     """A class representing a BLS compliant boot entry.
 
@@ -1022,20 +1380,22 @@ class BootEntry(object):
     method.
     """
 
-    _entry_data = None
-    _unwritten = False
-    _last_path = None
-    _comments = None
-    _osp = None
-    _bp = None
-    _bp_generation = None
-    _suppress_machine_id = False
-
-    # Read only state for foreign BLS entries
-    read_only = False
-
-    # boot_id cache
-    __boot_id = None
+    __slots__ = (
+        "_entry_data",
+        "_unwritten",
+        "_last_path",
+        "_comments",
+        "_osp",
+        "_bp",
+        "_bp_generation",
+        "_suppress_machine_id",
+        "read_only",
+        "__boot_id",
+        "_boot_id_state",
+        "_format_cache",
+        "_sorted_data",
+        "_entry_path_cache",
+    )
 
     def __str(
         self,
@@ -1079,35 +1439,35 @@ class BootEntry(object):
 
         :rtype: string
         """
-        be_str = prefix
+        parts = [prefix]
+        append = parts.append
+        suppress_machine_id = self._suppress_machine_id
 
-        for key in [k for k in ENTRY_KEYS if getattr(self, KEY_MAP[k])]:
-            if key == BOOM_ENTRY_MACHINE_ID and self._suppress_machine_id:
+        for key, attr, bls_key in _ENTRY_ATTRS:
+            if key == BOOM_ENTRY_MACHINE_ID and suppress_machine_id:
                 continue
-            attr = KEY_MAP[key]
-            key_fmt = '%s%s"%s"' if quote else "%s%s%s"
-            key_fmt += tail
-
             attr_val = getattr(self, attr)
+            if not attr_val:
+                continue
             if expand:
                 attr_val = _expand_vars(attr_val)
-
-            if bls:
-                key_data = (_transform_key(attr), sep, attr_val)
+            name = bls_key if bls else key
+            if quote:
+                append(f'{name}{sep}"{attr_val}"{tail}')
             else:
-                key_data = (key, sep, attr_val)
-            be_str += key_fmt % key_data
+                append(f"{name}{sep}{attr_val}{tail}")
 
         # BOOM_ENTRY_BOOT_ID requires special handling to avoid
         # recursion from the boot_id property method (which uses the
         # string representation of the object to calculate the
         # checksum).
         if not bls and not no_boot_id:
-            key_fmt = ('%s%s"%s"' if quote else "%s%s%s") + tail
-            boot_id_data = [BOOM_ENTRY_BOOT_ID, sep, self.boot_id]
-            be_str += key_fmt % tuple(boot_id_data)
+            if quote:
+                append(f'{BOOM_ENTRY_BOOT_ID}{sep}"{self.boot_id}"{tail}')
+            else:
+                append(f"{BOOM_ENTRY_BOOT_ID}{sep}{self.boot_id}{tail}")
 
-        return be_str.rstrip(tail) + suffix
+        return "".join(parts).rstrip(tail) + suffix
 
     def __str__(self):
         """Format BootEntry as a human-readable string in BLS notation.
@@ -1178,8 +1538,12 @@ class BootEntry(object):
         if not isinstance(key, str):
             raise TypeError("BootEntry key must be a string.")
 
-        if key in KEY_MAP and hasattr(self, KEY_MAP[key]):
-            return getattr(self, KEY_MAP[key])
+        # Evaluate the property once: templated values may be costly.
+        if key in KEY_MAP:
+            try:
+                return getattr(self, KEY_MAP[key])
+            except AttributeError:
+                pass
 
         raise KeyError("BootEntry key %s not present." % key)
 
@@ -1192,11 +1556,28 @@ class BootEntry(object):
         if not isinstance(key, str):
             raise TypeError("BootEntry key must be a string.")
 
-        if key in KEY_MAP and hasattr(self, KEY_MAP[key]):
+        # Test the class rather than the instance to avoid evaluating
+        # the property getter before setting the value.
+        if key in KEY_MAP and hasattr(BootEntry, KEY_MAP[key]):
             return setattr(self, KEY_MAP[key], value)
 
         raise KeyError("BootEntry key %s not present." % key)
 
+    def __sorted_entry_data(self):
+        """Return the reverse-sorted keys and values of ``_entry_data``.
+
+        The sorted lists are cached until the entry is next modified.
+
+        :returns: A ``(keys, values)`` tuple of lists.
+        :rtype: tuple
+        """
+        if self._sorted_data is None:
+            self._sorted_data = (
+                sorted(self._entry_data.keys(), reverse=True),
+                sorted(self._entry_data.values(), reverse=True),
+            )
+        return self._sorted_data
+
     def keys(self):
         """Return the list of keys for this ``BootEntry``.
 
@@ -1206,18 +1587,12 @@ class BootEntry(object):
         :returns: the current list of ``BotoEntry`` keys.
         :rtype: list of str
         """
-        keys = list(self._entry_data.keys())
-        add_keys = [BOOM_ENTRY_LINUX, BOOM_ENTRY_INITRD, BOOM_ENTRY_OPTIONS]
-
         # Sort the item list to give stable list ordering on Py3.
-        keys = sorted(keys, reverse=True)
-
-        if self.bp:
-            add_keys.append(BOOM_ENTRY_VERSION)
+        keys = list(self.__sorted_entry_data()[0])
+        entry_data = self._entry_data
+        add_keys = _ADD_KEYS_BP if self._bp else _ADD_KEYS
 
-        for k in add_keys:
-            if k not in self._entry_data:
-                keys.append(k)
+        keys.extend(k for k in add_keys if k not in entry_data)
 
         return keys
 
@@ -1229,16 +1604,14 @@ class BootEntry(object):
         :returns: the current list of ``BootEntry`` values.
         :rtype: list
         """
-        values = list(self._entry_data.values())
-        add_values = [self.linux, self.initrd, self.options]
-
         # Sort the item list to give stable list ordering on Py3.
-        values = sorted(values, reverse=True)
+        values = list(self.__sorted_entry_data()[1])
+        values.extend((self.linux, self.initrd, self.options))
 
-        if self.bp:
-            add_values.append(self.version)
+        if self._bp:
+            values.append(self.version)
 
-        return values + add_values
+        return values
 
     def items(self):
         """Return the items list for this BootEntry.
@@ -1249,21 +1622,21 @@ class BootEntry(object):
         :returns: the current list of ``BotoEntry`` items.
         :rtype: list of ``(key, value)`` tuples.
         """
-        items = list(self._entry_data.items())
-
-        add_items = [
-            (BOOM_ENTRY_LINUX, self.linux),
-            (BOOM_ENTRY_INITRD, self.initrd),
-            (BOOM_ENTRY_OPTIONS, self.options),
-        ]
-
-        if self.bp:
-            add_items.append((BOOM_ENTRY_VERSION, self.version))
-
         # Sort the item list to give stable list ordering on Py3.
-        items = sorted(items, key=lambda i: i[0], reverse=True)
+        entry_data = self._entry_data
+        items = [(k, entry_data[k]) for k in self.__sorted_entry_data()[0]]
+        items.extend(
+            (
+                (BOOM_ENTRY_LINUX, self.linux),
+                (BOOM_ENTRY_INITRD, self.initrd),
+                (BOOM_ENTRY_OPTIONS, self.options),
+            )
+        )
+
+        if self._bp:
+            items.append((BOOM_ENTRY_VERSION, self.version))
 
-        return items + add_items
+        return items
 
     def _dirty(self):
         """Mark this ``BootEntry`` as needing to be written to disk.
@@ -1278,14 +1651,22 @@ class BootEntry(object):
 
         :rtype: None
         """
+        # Setters update _entry_data before calling _dirty(): drop the
+        # sorted data and formatted values even if the entry is read-only.
+        self._sorted_data = None
+        self._format_cache = None
+
         if self.read_only:
             raise ValueError(
                 "Entry with boot_id='%s' is read-only." % self.disp_boot_id
             )
 
-        # Clear cached boot_id: it will be regenerated on next access
+        # Clear cached boot_id and entry path: they will be regenerated
+        # on next access
         self.__boot_id = None
+        self._entry_path_cache = None
         self._unwritten = True
+        _entries_changed()
 
     def __os_id_from_comment(self, comment):
         """Retrieve OsProfile from BootEntry comment.
@@ -1303,24 +1684,21 @@ class BootEntry(object):
         :returns: Comment lines not containing an OsIdentifier
         :rtype: str
         """
-        if "OsIdentifier:" not in comment:
-            return
+        match = _OS_ID_COMMENT_RE.search(comment)
+        if not match:
+            return None
 
-        outlines = ""
-        for line in comment.splitlines():
-            (key, os_id) = line.split(":")
-            os_id = os_id.strip()
-            osp = get_os_profile_by_id(os_id)
-
-            # An OsIdentifier comment is automatically added to the
-            # entry when it is written: do not add the read value to
-            # the comment list.
-            if not self._osp and osp:
-                self._osp = osp
-                _log_debug_entry("Parsed os_id='%s' from comment" % osp.disp_os_id)
-            else:
-                outlines += line + "\n"
-        return outlines
+        osp = get_os_profile_by_id(match.group(1))
+        if self._osp or not osp:
+            return comment
+
+        # An OsIdentifier comment is automatically added to the
+        # entry when it is written: do not add the read value to
+        # the comment list.
+        self._osp = osp
+        self.__boot_id = None
+        _log_debug_entry("Parsed os_id='%s' from comment", osp.disp_os_id)
+        return comment[: match.start()] + comment[match.end() :]
 
     def __match_os_profile(self):
         """Attempt to find a matching OsProfile for this BootEntry.
@@ -1337,6 +1715,7 @@ class BootEntry(object):
         edited.
         """
         self._osp = match_os_profile(self)
+        self.__boot_id = None
 
     def __match_host_profile(self):
         """Attempt to find a matching HostProfile for this BootEntry.
@@ -1352,6 +1731,7 @@ class BootEntry(object):
             machine_id = self._entry_data[BOOM_ENTRY_MACHINE_ID]
             hps = find_host_profiles(Selection(machine_id=machine_id))
             self._osp = hps[0] if hps else self._osp
+            self.__boot_id = None
 
         # Import add/del options from HostProfile if attached.
         if hasattr(self._osp, "add_opts"):
@@ -1393,9 +1773,9 @@ class BootEntry(object):
                     "BootEntry missing BOOM_ENTRY_LINUX or" " BOOM_ENTRY_EFI"
                 )
 
-        self._entry_data = {}
-        for key in [k for k in ENTRY_KEYS if k in entry_data]:
-            self._entry_data[key] = entry_data[key]
+        self._entry_data = {
+            key: entry_data[key] for key in ENTRY_KEYS if key in entry_data
+        }
 
         if not self._osp:
             self.__match_os_profile()
@@ -1408,10 +1788,12 @@ class BootEntry(object):
             # boot_params is always authoritative
             self._entry_data[BOOM_ENTRY_VERSION] = self.bp.version
         else:
-            _log_debug_entry(
-                "Initialising BootParams() from "
-                "BootEntry(boot_id='%s')" % self.boot_id
-            )
+            # Avoid generating a boot_id only to log it.
+            if _log.isEnabledFor(logging.DEBUG):
+                _log_debug_entry(
+                    "Initialising BootParams() from BootEntry(boot_id='%s')",
+                    self.boot_id,
+                )
             # Attempt to recover BootParams from entry data
             self._bp = BootParams.from_entry(self)
             self._bp_generation = self._bp.generation
@@ -1431,6 +1813,7 @@ class BootEntry(object):
             # allow comparison of stored value with template.
             _entry_data = self._entry_data
             self._entry_data = {}
+            self._format_cache = None
 
             # Clear templated keys from _entry_data and if the value
             # read from entry_data is identical to that generated by the
@@ -1441,6 +1824,13 @@ class BootEntry(object):
             _pop_if_set(BOOM_ENTRY_OPTIONS)
             self._entry_data = _entry_data
 
+        # The boot_id may have been generated before the BootParams
+        # and profiles for this entry were attached: discard it.
+        self.__boot_id = None
+        self._sorted_data = None
+        self._format_cache = None
+        self._entry_path_cache = None
+
     def __from_file(self, entry_file, boot_params):
         """Initialise a new BootEntry from on-disk data.
 
@@ -1486,33 +1876,37 @@ class BootEntry(object):
             return maybe_machine_id
 
         entry_data = {}
-        comments = {}
-        comment = ""
+        # Most entries have no comments other than the OsIdentifier:
+        # only allocate the comments dictionary when one is stored.
+        comments = None
+        comment_lines = []
 
         entry_basename = basename(entry_file)
-        _log_debug("Loading BootEntry from '%s'" % entry_basename)
+        _log_debug("Loading BootEntry from '%s'", entry_basename)
         self._last_path = entry_file
 
         with open(entry_file, "r") as ef:
-            for line in ef:
-                if blank_or_comment(line):
-                    comment += line if line else ""
-                else:
-                    bls_key, value = parse_name_value(
-                        line, separator=None, allow_empty=True
-                    )
-                    # Convert BLS key name to Boom notation
-                    key = _transform_key(bls_key)
-                    if key not in MAP_KEY:
-                        raise LookupError("Unknown BLS key '%s'" % bls_key)
-                    key = MAP_KEY[_transform_key(bls_key)]
-                    entry_data[key] = value
-                    if comment:
-                        comment = self.__os_id_from_comment(comment)
-                        if not comment:
-                            continue
-                        comments[key] = comment
-                        comment = ""
+            lines = ef.readlines()
+
+        for line in lines:
+            # Inline blank_or_comment(): this runs for every entry line.
+            stripped = line.lstrip()
+            if not stripped or stripped[0] == "#":
+                comment_lines.append(line)
+                continue
+            bls_key, value = parse_name_value(line, separator=None, allow_empty=True)
+            # Convert BLS key name to Boom notation
+            key = _BLS_KEY_MAP.get(bls_key)
+            if key is None:
+                raise LookupError("Unknown BLS key '%s'" % bls_key)
+            entry_data[key] = value
+            if comment_lines:
+                comment = self.__os_id_from_comment("".join(comment_lines))
+                comment_lines = []
+                if comment:
+                    if comments is None:
+                        comments = {}
+                    comments[key] = comment
         self._comments = comments
 
         # Red Hat native BLS entries do not set the machine-id BLS key:
@@ -1534,13 +1928,13 @@ class BootEntry(object):
 
         self.__from_data(entry_data, boot_params)
 
-        match = re.match(BOOT_ENTRIES_PATTERN, entry_basename)
+        match = _BOOT_ENTRIES_RE.match(entry_basename)
         if not match or len(match.groups()) <= 1:
-            _log_info("Marking unknown boot entry as read-only: %s" % entry_basename)
+            _log_info("Marking unknown boot entry as read-only: %s", entry_basename)
             self.read_only = True
         else:
             if self.disp_boot_id != match.group(2):
-                _log_info("Entry file name does not match boot_id: %s" % entry_basename)
+                _log_info("Entry file name does not match boot_id: %s", entry_basename)
                 self.update_entry(force=True)
 
         self._unwritten = False
@@ -1609,6 +2003,30 @@ class BootEntry(object):
 
         :rtype: BootEntry
         """
+        self._entry_data = None
+        self._unwritten = False
+        self._last_path = None
+        self._comments = None
+        self._bp = None
+        self._bp_generation = None
+        self._suppress_machine_id = False
+
+        # Read only state for foreign BLS entries
+        self.read_only = False
+
+        # boot_id cache and the profile state it was generated from
+        self.__boot_id = None
+        self._boot_id_state = None
+
+        # _apply_format() results and the state they were generated from
+        self._format_cache = None
+
+        # Reverse-sorted (keys, values) cache for _entry_data
+        self._sorted_data = None
+
+        # (boot_id, entries path, entry path) cache for _entry_path
+        self._entry_path_cache = None
+
         # An osprofile kwarg always takes precedent over either an
         # 'OsIdentifier' comment or a matched osprofile value.
         self._osp = osprofile
@@ -1655,6 +2073,45 @@ class BootEntry(object):
             if not allow_no_dev:
                 check_root_device(self.bp.root_device)
 
+    def _template_state(self):
+        """Return the template state of this ``BootEntry``.
+
+        Templated values depend on the attached ``BootParams`` and
+        profiles: return a tuple of the identity and generation of
+        each, that compares unequal if any of these have changed.
+
+        :returns: A tuple describing the current template state.
+        :rtype: tuple
+        """
+        bp = self._bp
+        osp = self._osp
+        hp_osp = getattr(osp, "_osp", None)
+        return (
+            bp,
+            bp.generation if bp else None,
+            osp,
+            osp.generation if osp is not None else None,
+            hp_osp,
+            hp_osp.generation if hp_osp is not None else None,
+        )
+
+    def _formatted_values(self):
+        """Return the cache of formatted values for this ``BootEntry``.
+
+        Formatted values depend on this entry's data (the cache is
+        cleared by ``_dirty()``), and on the attached ``BootParams``
+        and profiles: the cache is keyed on the identity and generation
+        of each, and is discarded if any of these have changed.
+
+        :returns: A dictionary mapping format strings and derived
+                  property names to their formatted values.
+        :rtype: dict
+        """
+        state = self._template_state()
+        if self._format_cache is None or self._format_cache[0] != state:
+            self._format_cache = (state, {})
+        return self._format_cache[1]
+
     def _apply_format(self, fmt):
         """Apply key format string substitution.
 
@@ -1688,141 +2145,28 @@ class BootEntry(object):
         :returns: The formatted string
         :rtype: str
         """
-        key_format = "%%{%s}"
-        bp = self.bp
-
         if not fmt:
             return ""
 
-        # Table-driven key formatting
-        #
-        # Each entry in the format_key_specs table specifies a list of
-        # possible key substitutions to perform for the named key. Each
-        # entry of the key_spec list contains a dictionary containing
-        # one or more attribute sources or predicates.
-        #
-        # A key substitution is evaluated if at least one of the listed
-        # attribute sources is defined, and if all defined predicates
-        # evaluate to True. A predicate must be a Python callable
-        # accepting no arguments and returning a boolean. A key_spec
-        # may also specify an explicit list of needed objects, "bp",
-        # or "osp", that must exist to evaluate predicates.
-        #
-        # Several helper functions exist to obtain key values from the
-        # appropriate data source (accounting for keys that exist in
-        # multiple objects as well as keys that return None or empty
-        # values), to test key_spec predicates, and to safely obtain
-        # function attributes where the containing object may or may
-        # not exist.
-        def get_key_attr(key_spec):
-            """Return a key's value attribute.
-
-            Return a value from either `BootParams`, `OsProfile`,
-            or `BootEntry`. Each source is tested in order and the
-            value is taken from the first object type with a value
-            for the named key.
-            """
+        # Strings without format keys need no substitution: skip building
+        # the key specification table.
+        if "%{" not in fmt:
+            return fmt
 
-            def have_attr():
-                """Test whether any attribute source for this key exists."""
-                attrs_vals = [(BP_ATTR, bp), (OSP_ATTR, self._osp), (BE_ATTR, True)]
-                have = False
-                for attr, source in attrs_vals:
-                    if attr in key_spec:
-                        have |= source is not None
-                return have
-
-            val_fmt = "%s" if VAL_FMT not in key_spec else key_spec[VAL_FMT]
-
-            if have_attr():
-                if BP_ATTR in key_spec and bp:
-                    value = getattr(bp, key_spec[BP_ATTR])
-                elif OSP_ATTR in key_spec:
-                    value = getattr(self._osp, key_spec[OSP_ATTR])
-                elif BE_ATTR in key_spec:
-                    value = getattr(self, key_spec[BE_ATTR])
-                return val_fmt % value if value is not None else None
-            else:
-                return None
-
-        def test_predicates(key_spec):
-            """Test all defined predicate functions and return `True` if
-            all evaluate `True`, or `False` otherwise.
-            """
-            if PRED_FN not in key_spec:
-                return True
-            predicates = key_spec[PRED_FN]
-            # Ignore invalid predicates
-            return all([fn() for fn in predicates if fn])
-
-        def mkpred(obj, fn):
-            """Return a callable predicate function for method ``fn`` of
-            object ``obj`` if ``obj`` is valid and contains ``fn``,
-            or ``None`` otherwise.
-
-            This is used to safely build predicate function lists
-            whether or not the objects they reference are defined
-            or not for a given substitution key.
-            """
-            return getattr(obj, fn) if obj else None
-
-        # Key spec constants
-        BE_ATTR = "be_attr"
-        BP_ATTR = "bp_attr"
-        OSP_ATTR = "osp_attr"
-        PRED_FN = "pred_fn"
-        VAL_FMT = "val_fmt"
-        NEEDS = "needs"
-
-        format_key_specs = {
-            FMT_VERSION: [{BE_ATTR: "version", BP_ATTR: "version"}],
-            FMT_LVM_ROOT_LV: [{BP_ATTR: "lvm_root_lv"}],
-            FMT_LVM_ROOT_OPTS: [{OSP_ATTR: "root_opts_lvm2"}],
-            FMT_BTRFS_ROOT_OPTS: [{OSP_ATTR: "root_opts_btrfs"}],
-            FMT_BTRFS_SUBVOLUME: [
-                {
-                    BP_ATTR: "btrfs_subvol_id",
-                    NEEDS: "bp",
-                    PRED_FN: [mkpred(bp, "has_btrfs")],
-                    VAL_FMT: "subvolid=%s",
-                },
-                {
-                    BP_ATTR: "btrfs_subvol_path",
-                    NEEDS: "bp",
-                    PRED_FN: [mkpred(bp, "has_btrfs")],
-                    VAL_FMT: "subvol=%s",
-                },
-            ],
-            FMT_STRATIS_POOL_UUID: [
-                {
-                    BP_ATTR: "stratis_pool_uuid",
-                    NEEDS: "bp",
-                    PRED_FN: [mkpred(bp, "has_stratis")],
-                }
-            ],
-            FMT_ROOT_DEVICE: [{BP_ATTR: "root_device", NEEDS: "bp"}],
-            FMT_ROOT_OPTS: [{BE_ATTR: "root_opts", NEEDS: "bp"}],
-            FMT_KERNEL: [{BE_ATTR: "linux", NEEDS: "bp"}],
-            FMT_INITRAMFS: [{BE_ATTR: "initrd", NEEDS: "bp"}],
-            FMT_OS_NAME: [{OSP_ATTR: "os_name"}],
-            FMT_OS_SHORT_NAME: [{OSP_ATTR: "os_short_name"}],
-            FMT_OS_VERSION: [{OSP_ATTR: "os_version"}],
-            FMT_OS_VERSION_ID: [{OSP_ATTR: "os_version_id"}],
-        }
+        formatted = self._formatted_values()
+        if fmt in formatted:
+            return formatted[fmt]
+        bp = self._bp
+        osp = self._osp
+        orig_fmt = fmt
 
-        for key_name in format_key_specs.keys():
-            key = key_format % key_name
+        for key, key_specs in _FORMAT_KEY_SPECS:
             if key not in fmt:
                 continue
-            for key_spec in format_key_specs[key_name]:
-                # Check NEEDS
-                for k in key_spec.keys():
-                    if k == NEEDS:
-                        if key_spec[k] == "bp" and not bp:
-                            continue
-                        if key_spec[k] == "osp" and not self._osp:
-                            continue
-                if not test_predicates(key_spec):
+            for key_spec in key_specs:
+                # Predicates are only tested if a BootParams is attached
+                predicates = key_spec.get(_PRED_FN, ())
+                if bp and not all(getattr(bp, fn)() for fn in predicates):
                     continue
                 # A key value of None means the key should not be substituted:
                 # this occurs when accessing a templated attribute of an entry
@@ -1831,11 +2175,15 @@ class BootEntry(object):
                 #
                 # If the value is not None, but contains the empty string, the
                 # value is substituted as normal.
-                value = get_key_attr(key_spec)
+                value = _format_key_value(key_spec, self, bp, osp)
                 if value is None:
                     continue
+                # The first key_spec with a value supplies the substitution:
+                # the remaining alternatives need not be evaluated.
                 fmt = fmt.replace(key, value)
+                break
 
+        formatted[orig_fmt] = fmt
         return fmt
 
     def __generate_boot_id(self):
@@ -1863,16 +2211,6 @@ class BootEntry(object):
         ).hexdigest()
         return boot_id
 
-    def _entry_data_property(self, name):
-        """Return property value from entry data.
-
-        :param name: The boom key name of the property to return
-        :returns: The property value from the entry data dictionary
-        """
-        if self._entry_data and name in self._entry_data:
-            return self._entry_data[name]
-        return None
-
     def _have_optional_key(self, key):
         """Return ``True`` if optional BLS key ``key`` is permitted by
         the attached ``OsProfile``, or ``False`` otherwise.
@@ -1917,7 +2255,13 @@ class BootEntry(object):
         :getter: return this BootEntry's boot_id.
         :type: str
         """
-        return self.boot_id[: min_boot_id_width()]
+        boot_id = self.boot_id
+        # Use the cached width directly while the loaded entries are
+        # unchanged: listing N entries makes N calls.
+        (generation, width) = _boot_id_width
+        if generation != _entries_generation:
+            width = min_boot_id_width()
+        return boot_id[:width]
 
     @property
     def boot_id(self):
@@ -1927,12 +2271,21 @@ class BootEntry(object):
         :type: string
         """
         # Mark ourself dirty if boot parameters have changed.
-        if self.bp and self.bp.generation != self._bp_generation:
-            self._bp_generation = self.bp.generation
+        bp = self._bp
+        if bp and bp.generation != self._bp_generation:
+            self._bp_generation = bp.generation
             self._dirty()
-        if not self.__boot_id or self._unwritten:
+        # The boot_id of an unwritten entry follows edits to its profiles;
+        # a written entry keeps the boot_id that names its file on disk.
+        if self.__boot_id and self._unwritten:
+            if self._template_state() != self._boot_id_state:
+                self.__boot_id = None
+                self._entry_path_cache = None
+        if not self.__boot_id:
             self.__boot_id = self.__generate_boot_id()
-            _log_debug_entry("Generated new boot_id='%s'" % self.__boot_id)
+            self._boot_id_state = self._template_state()
+            _entries_changed()
+            _log_debug_entry("Generated new boot_id='%s'", self.__boot_id)
         return self.__boot_id
 
     @property
@@ -1942,10 +2295,13 @@ class BootEntry(object):
         :getter: Returns the root options string for this ``BootEntry``.
         :type: string
         """
-        if not self._osp or not self.bp:
-            return ""
-        bp = self.bp
+        bp = self._bp
         osp = self._osp
+        if not osp or not bp:
+            return ""
+        formatted = self._formatted_values()
+        if _CACHE_ROOT_OPTS in formatted:
+            return formatted[_CACHE_ROOT_OPTS]
         root_opts = []
 
         if bp.lvm_root_lv:
@@ -1956,11 +2312,12 @@ class BootEntry(object):
             btrfs_opts = self._apply_format(osp.root_opts_btrfs)
             root_opts.append(btrfs_opts)
 
-        if is_stratis_device_path(self.bp.root_device):
+        if bp.has_stratis():
             stratis_opts = self._apply_format(ROOT_OPTS_STRATIS)
             root_opts.append(stratis_opts)
 
-        return " ".join(root_opts)
+        formatted[_CACHE_ROOT_OPTS] = " ".join(root_opts)
+        return formatted[_CACHE_ROOT_OPTS]
 
     @property
     def title(self):
@@ -1971,7 +2328,7 @@ class BootEntry(object):
         :type: string
         """
         if BOOM_ENTRY_TITLE in self._entry_data:
-            return self._entry_data_property(BOOM_ENTRY_TITLE)
+            return self._entry_data[BOOM_ENTRY_TITLE]
 
         if not self._osp or not self.bp:
             return ""
@@ -1997,7 +2354,7 @@ class BootEntry(object):
         :setter: sets this ``BootEntry`` object's ``machine_id``.
         :type: string
         """
-        return self._entry_data_property(BOOM_ENTRY_MACHINE_ID)
+        return self._entry_data.get(BOOM_ENTRY_MACHINE_ID)
 
     @machine_id.setter
     def machine_id(self, machine_id):
@@ -2014,7 +2371,7 @@ class BootEntry(object):
         """
         if self.bp and BOOM_ENTRY_VERSION not in self._entry_data:
             return self.bp.version
-        return self._entry_data_property(BOOM_ENTRY_VERSION)
+        return self._entry_data.get(BOOM_ENTRY_VERSION)
 
     @version.setter
     def version(self, version):
@@ -2031,86 +2388,26 @@ class BootEntry(object):
         :rtype: string
         """
 
-        def add_opts(opts, append):
-            """Append additional kernel options to this options string.
-
-            Format the elements of list ``append`` as a space separated
-            string, and return them appended to the existing options
-            string ``opts``.
-
-            :param opts: A kernel command line options string.
-            :param append: A list of additional options to append.
-            :returns: A string with additional options appended.
-            :rtype: string
-            """
-            extra = " ".join(append)
-            return "%s %s" % (opts, extra) if append else opts
-
-        def del_opt(opt, drop):
-            """Return ``True`` if option ``opt`` should be dropped or
-            ``False`` otherwise.
-
-            Test the option ``opt`` against the drop specification ``drop``
-            and return ``True`` if the option should be dropped according
-            to the spec, or ``False`` otherwise.
-
-            :param opt: A kernel command line option with or without value.
-            :param drop: A drop specification in Boom del_opts notation
-                         (see ``del_opts`` for further details of syntax).
-            :returns: ``True`` if the option should be dropped or ``False``
-                      otherwise.
-            :rtype: bool
-            """
-            # "name" or "name=value"
-            if opt in drop:
-                return True
-
-            # "name=" wildcard
-            if ("%s=" % opt.split("=")[0]) in drop:
-                return True
-            return False
-
-        def del_opts(opts, drop):
-            """Remove template-supplied kernel options matching ``drop`` from
-            options string ``opts``.
-
-            A drop specification matches either a simple name, a name and
-            its full value (in which case both must match), or a name,
-            followed by '=', indicating that an option with value should
-            be dropped regardless of the actual value:
-
-            <name>         drop name
-            <name>=        drop name and any value
-            <name>=<value> drop name only if its value == value
-
-            :param opts: A kernel command line options string.
-            :param drop: A drop specification to apply to ``opts``.
-            :returns: A kernel command line options string with options
-                      matching ``drop`` removed.
-            :rtype: string
-            """
-            return " ".join([o for o in opts.split() if not del_opt(o, drop)])
-
-        def do_null(opts):
-            """Dummy expansion function."""
-            return opts
-
-        # Optionally expand environment variable references.
-        do_exp = _expand_vars if expand else do_null
-
+        # Expansion depends on the current bootloader environment and
+        # is applied after the cached, unexpanded options are built.
+        bp = self._bp
         if BOOM_ENTRY_OPTIONS in self._entry_data:
-            opts = self._entry_data_property(BOOM_ENTRY_OPTIONS)
-            if self.bp and not self.read_only:
-                opts = add_opts(opts, self.bp.add_opts)
-                return do_exp(del_opts(opts, self.bp.del_opts))
-            return do_exp(opts)
-
-        if self._osp and self.bp:
-            opts = self._apply_format(self._osp.options)
-            opts = add_opts(opts, self.bp.add_opts)
-            return do_exp(del_opts(opts, self.bp.del_opts))
+            opts = self._entry_data[BOOM_ENTRY_OPTIONS]
+            if not bp or self.read_only:
+                return _expand_vars(opts) if expand else opts
+        elif self._osp and bp:
+            opts = None
+        else:
+            return ""
 
-        return ""
+        formatted = self._formatted_values()
+        if _CACHE_OPTIONS not in formatted:
+            if opts is None:
+                opts = self._apply_format(self._osp.options)
+            opts = _append_opts(opts, bp.add_opts)
+            formatted[_CACHE_OPTIONS] = _drop_opts(opts, bp.del_opts)
+        opts = formatted[_CACHE_OPTIONS]
+        return _expand_vars(opts) if expand else opts
 
     @property
     def expand_options(self):
@@ -2153,7 +2450,7 @@ class BootEntry(object):
         :type: string
         """
         if not self._osp or BOOM_ENTRY_LINUX in self._entry_data:
-            return self._entry_data_property(BOOM_ENTRY_LINUX)
+            return self._entry_data.get(BOOM_ENTRY_LINUX)
 
         kernel_path = self._apply_format(self._osp.kernel_pattern)
         return kernel_path
@@ -2177,7 +2474,7 @@ class BootEntry(object):
         :rtype: string
         """
         if not self._osp or BOOM_ENTRY_INITRD in self._entry_data:
-            initrd_string = self._entry_data_property(BOOM_ENTRY_INITRD)
+            initrd_string = self._entry_data.get(BOOM_ENTRY_INITRD)
             if expand:
                 return _expand_vars(initrd_string)
             return initrd_string
@@ -2221,7 +2518,7 @@ class BootEntry(object):
         :getter: sets the configured EFI application image.
         :type: string
         """
-        return self._entry_data_property(BOOM_ENTRY_EFI)
+        return self._entry_data.get(BOOM_ENTRY_EFI)
 
     @efi.setter
     def efi(self, efi):
@@ -2236,7 +2533,7 @@ class BootEntry(object):
         :getter: sets the configured device tree archive.
         :type: string
         """
-        return self._entry_data_property(BOOM_ENTRY_DEVICETREE)
+        return self._entry_data.get(BOOM_ENTRY_DEVICETREE)
 
     @devicetree.setter
     def devicetree(self, devicetree):
@@ -2251,7 +2548,7 @@ class BootEntry(object):
         :setter: sets the architecture for this entry.
         :type: string
         """
-        return self._entry_data_property(BOOM_ENTRY_ARCHITECTURE)
+        return self._entry_data.get(BOOM_ENTRY_ARCHITECTURE)
 
     @architecture.setter
     def architecture(self, architecture):
@@ -2273,7 +2570,7 @@ class BootEntry(object):
         bls_key = KEY_MAP[BOOM_ENTRY_GRUB_USERS]
         if not self._have_optional_key(bls_key):
             return ""
-        return self._entry_data_property(BOOM_ENTRY_GRUB_USERS)
+        return self._entry_data.get(BOOM_ENTRY_GRUB_USERS)
 
     @grub_users.setter
     def grub_users(self, grub_users):
@@ -2284,6 +2581,7 @@ class BootEntry(object):
                 % (self._osp.disp_os_id, bls_key)
             )
         self._entry_data[BOOM_ENTRY_GRUB_USERS] = grub_users
+        self._dirty()
 
     @property
     def grub_arg(self):
@@ -2296,7 +2594,7 @@ class BootEntry(object):
         bls_key = KEY_MAP[BOOM_ENTRY_GRUB_ARG]
         if not self._have_optional_key(bls_key):
             return ""
-        return self._entry_data_property(BOOM_ENTRY_GRUB_ARG)
+        return self._entry_data.get(BOOM_ENTRY_GRUB_ARG)
 
     @grub_arg.setter
     def grub_arg(self, grub_arg):
@@ -2307,6 +2605,7 @@ class BootEntry(object):
                 % (self._osp.disp_os_id, bls_key)
             )
         self._entry_data[BOOM_ENTRY_GRUB_ARG] = grub_arg
+        self._dirty()
 
     @property
     def grub_class(self):
@@ -2319,7 +2618,7 @@ class BootEntry(object):
         bls_key = KEY_MAP[BOOM_ENTRY_GRUB_CLASS]
         if not self._have_optional_key(bls_key):
             return ""
-        return self._entry_data_property(BOOM_ENTRY_GRUB_CLASS)
+        return self._entry_data.get(BOOM_ENTRY_GRUB_CLASS)
 
     @grub_class.setter
     def grub_class(self, grub_class):
@@ -2330,6 +2629,7 @@ class BootEntry(object):
                 % (self._osp.disp_os_id, bls_key)
             )
         self._entry_data[BOOM_ENTRY_GRUB_CLASS] = grub_class
+        self._dirty()
 
     @property
     def id(self):
@@ -2342,7 +2642,7 @@ class BootEntry(object):
         bls_key = KEY_MAP[BOOM_ENTRY_GRUB_ID]
         if not self._have_optional_key(bls_key):
             return ""
-        return self._entry_data_property(BOOM_ENTRY_GRUB_ID)
+        return self._entry_data.get(BOOM_ENTRY_GRUB_ID)
 
     @id.setter
     def id(self, ident):
@@ -2353,12 +2653,20 @@ class BootEntry(object):
                 % (self._osp.disp_os_id, bls_key)
             )
         self._entry_data[BOOM_ENTRY_GRUB_ID] = ident
+        self._dirty()
 
     @property
     def _entry_path(self):
-        id_tuple = (self.machine_id, self.boot_id[0:7], self.version)
+        boot_id = self.boot_id
+        entries_path = boom_entries_path()
+        cache = self._entry_path_cache
+        if cache and cache[0] == boot_id and cache[1] == entries_path:
+            return cache[2]
+        id_tuple = (self.machine_id, boot_id[0:7], self.version)
         file_name = BOOT_ENTRIES_FORMAT % id_tuple
-        return path_join(boom_entries_path(), file_name)
+        entry_path = path_join(entries_path, file_name)
+        self._entry_path_cache = (boot_id, entries_path, entry_path)
+        return entry_path
 
     @property
     def entry_path(self):
@@ -2367,6 +2675,29 @@ class BootEntry(object):
             return self._last_path
         return self._entry_path
 
+    @staticmethod
+    def __file_matches(path, text):
+        """Test whether the file at ``path`` contains exactly ``text``.
+
+        If the content matches but the file mode is not
+        ``BOOT_ENTRY_MODE`` the mode is corrected.
+
+        :param path: The path to the file to compare.
+        :param text: The expected file content.
+        :returns: ``True`` if the file exists and its content is equal
+                  to ``text``, or ``False`` otherwise.
+        :rtype: bool
+        """
+        try:
+            with open(path, "r") as f:
+                if f.read() != text:
+                    return False
+                if S_IMODE(fstat(f.fileno()).st_mode) != BOOT_ENTRY_MODE:
+                    fchmod(f.fileno(), BOOT_ENTRY_MODE)
+                return True
+        except (OSError, UnicodeDecodeError):
+            return False
+
     def write_entry(self, force=False, expand=False):
         """Write out entry to disk.
 
@@ -2381,6 +2712,8 @@ class BootEntry(object):
         If the value of ``force`` is ``False`` and the ``OsProfile``
         is not currently marked as dirty (either new, or modified
         since the last load operation) the write will be skipped.
+        The write is also skipped if ``force`` is ``False`` and the
+        entry file already contains identical data.
 
         :param force: Force this entry to be written to disk even
                       if the entry is unmodified.
@@ -2394,23 +2727,37 @@ class BootEntry(object):
         if not self._unwritten and not force:
             return
         entry_path = self._entry_path
+
+        entry_lines = []
+        if self._osp:
+            # Insert OsIdentifier comment at top-of-file
+            entry_lines.append("#OsIdentifier: %s\n" % self._osp.os_id)
+        entry_lines.append((self.expanded() if expand else str(self)) + "\n")
+        entry_text = "".join(entry_lines)
+
+        # A modified entry may still match the data already on disk (for
+        # e.g. if a value was set back to its previous value): this is
+        # only possible if the entry is still backed by the same file.
+        unchanged = not force and entry_path == self._last_path
+        if unchanged and self.__file_matches(entry_path, entry_text):
+            _log_debug_entry("Entry file %s is unchanged", entry_path)
+            self._last_path = entry_path
+            self._unwritten = False
+            _add_entry(self)
+            return
+
         (tmp_fd, tmp_path) = mkstemp(prefix="boom", dir=boom_entries_path())
-        with fdopen(tmp_fd, "w") as f:
-            # Our original file descriptor will be closed on exit from the
-            # fdopen with statement: save a copy so that we can call fdatasync
-            # once at the end of writing rather than on each loop iteration.
-            tmp_fd = dup(tmp_fd)
-            if self._osp:
-                # Insert OsIdentifier comment at top-of-file
-                f.write("#OsIdentifier: %s\n" % self._osp.os_id)
-            if expand:
-                f.write(self.expanded() + "\n")
-            else:
-                f.write(str(self) + "\n")
         try:
-            fdatasync(tmp_fd)
-            rename(tmp_path, entry_path)
-            chmod(entry_path, BOOT_ENTRY_MODE)
+            # The entry is written with a single buffered write: flush and
+            # sync it, and set the final mode, before the file object closes
+            # the descriptor so that the entry is never visible with the
+            # temporary file's mode.
+            with fdopen(tmp_fd, "w") as f:
+                f.write(entry_text)
+                f.flush()
+                fchmod(f.fileno(), BOOT_ENTRY_MODE)
+                fdatasync(f.fileno())
+            replace(tmp_path, entry_path)
         except Exception as e:
             _log_error("Error writing entry file %s: %s" % (entry_path, e))
             try:
@@ -2458,8 +2805,9 @@ class BootEntry(object):
         # Cache old entry path
         to_unlink = self._last_path
         self.write_entry(force=force, expand=expand)
-        _log_info("Rewrote entry %s as %s", self.disp_boot_id, self._entry_path)
-        if self._entry_path != to_unlink:
+        entry_path = self._entry_path
+        _log_info("Rewrote entry %s as %s", self.disp_boot_id, entry_path)
+        if entry_path != to_unlink:
             try:
                 unlink(to_unlink)
             except Exception as e:
@@ -2482,12 +2830,13 @@ class BootEntry(object):
                 "Cannot delete read-only boot " "entry: %s" % self._last_path
             )
 
-        if not path_exists(self._entry_path):
-            raise ValueError("Entry does not exist: %s" % self._entry_path)
+        entry_path = self._entry_path
         try:
-            unlink(self._entry_path)
+            unlink(entry_path)
+        except FileNotFoundError:
+            raise ValueError("Entry does not exist: %s" % entry_path)
         except Exception as e:
-            _log_error("Error removing entry file %s: %s" % (self._entry_path, e))
+            _log_error("Error removing entry file %s: %s" % (entry_path, e))
             raise
 
         if not self._unwritten:
@@ -400,11 +400,15 @@ def match_host_profile(entry):
     # Attempt to match by uname pattern
     for hp in _host_profiles:
         if hp.machine_id == entry.machine_id:
-            _log_debug(
-                "Matched BootEntry(version='%s', boot_id='%s') "
-                "to HostProfile(name='%s', machine_id='%s')"
-                % (entry.version, entry.disp_boot_id, hp.host_name, hp.machine_id)
-            )
+            if _log.isEnabledFor(logging.DEBUG):
+                _log_debug(
+                    "Matched BootEntry(version='%s', boot_id='%s') "
+                    "to HostProfile(name='%s', machine_id='%s')",
+                    entry.version,
+                    entry.disp_boot_id,
+                    hp.host_name,
+                    hp.machine_id,
+                )
             return hp
 
     return None
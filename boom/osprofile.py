@@ -38,6 +38,7 @@ from hashlib import sha1
 from tempfile import mkstemp
 from os.path import basename, join as path_join, exists as path_exists
 from os import fdopen, rename, chmod, unlink, fdatasync
+from functools import lru_cache
 import logging
 import re
 
@@ -419,15 +420,20 @@ def match_os_profile(entry):
     )
 
     # Attempt to match by uname pattern
+    version = entry.version
     for osp in sorted(_profiles, key=lambda o: (o.os_name, o.os_version)):
         if _is_null_profile(osp):
             continue
-        if osp.match_uname_version(entry.version):
-            _log_debug(
-                "Matched BootEntry(version='%s', boot_id='%s') "
-                "to OsProfile(name='%s', os_id='%s')"
-                % (entry.version, entry.disp_boot_id, osp.os_name, osp.disp_os_id)
-            )
+        if osp.match_uname_version(version):
+            if _log.isEnabledFor(logging.DEBUG):
+                _log_debug(
+                    "Matched BootEntry(version='%s', boot_id='%s') "
+                    "to OsProfile(name='%s', os_id='%s')",
+                    version,
+                    entry.disp_boot_id,
+                    osp.os_name,
+                    osp.disp_os_id,
+                )
             return osp
 
     # No matching uname pattern: attempt to match options template
@@ -435,14 +441,19 @@ def match_os_profile(entry):
         if _is_null_profile(osp):
             continue
         if osp.match_options(entry):
-            _log_debug(
-                "Matched BootEntry(version='%s', boot_id='%s') "
-                "to OsProfile(name='%s', os_id='%s')"
-                % (entry.version, entry.disp_boot_id, osp.os_name, osp.disp_os_id)
-            )
+            if _log.isEnabledFor(logging.DEBUG):
+                _log_debug(
+                    "Matched BootEntry(version='%s', boot_id='%s') "
+                    "to OsProfile(name='%s', os_id='%s')",
+                    entry.version,
+                    entry.disp_boot_id,
+                    osp.os_name,
+                    osp.disp_os_id,
+                )
             return osp
 
-    _log_debug_profile("No matching profile found for boot_id=%s" % entry.boot_id)
+    if _log.isEnabledFor(logging.DEBUG):
+        _log_debug_profile("No matching profile found for boot_id=%s", entry.boot_id)
 
     # Assign the Null profile to this BootEntry: we cannot determine a
     # valid OsProfile to associate with it, so it cannot be modified or
@@ -478,6 +489,51 @@ def key_from_key_name(key_name):
     return key_format % key_name
 
 
+#: Regular expression characters that end a literal prefix.
+_REGEX_SPECIAL = frozenset(".^$*+?{}[]\\|()")
+#: Quantifiers that make the preceding character optional.
+_REGEX_OPTIONAL = frozenset("*?{")
+
+
+def _regex_literal(exp):
+    """Return a literal string contained in every match of ``exp``.
+
+    The literal is the prefix of ``exp`` that precedes the first
+    regular expression special character, and may be tested with
+    a substring check before running the regular expression: a
+    word that does not contain the literal cannot match.
+
+    :param exp: A regular expression string.
+    :returns: A literal prefix string, or the empty string if no
+              literal prefix can be determined.
+    :rtype: str
+    """
+    if "|" in exp:
+        return ""
+    for i, char in enumerate(exp):
+        if char in _REGEX_SPECIAL:
+            return exp[: max(i - 1, 0) if char in _REGEX_OPTIONAL else i]
+    return exp
+
+
+@lru_cache(maxsize=64)
+def _compile_regex_words(regex_words):
+    """Compile a sequence of format regex words.
+
+    Compiled results are shared by all profiles that generate the
+    same regex words (for e.g. an ``OsProfile`` and the
+    ``HostProfile`` objects that inherit its templates).
+
+    :param regex_words: A tuple of ``(key, expr)`` tuples as returned
+                        by ``BoomProfile.make_format_regexes()``.
+    :returns: A tuple of ``(key, expr, regex, literal)`` tuples.
+    :rtype: tuple of (str, str, re.Pattern, str)
+    """
+    return tuple(
+        (name, exp, re.compile(exp), _regex_literal(exp)) for (name, exp) in regex_words
+    )
+
+
 class BoomProfile(object):
     """Class ``BoomProfile`` is the abstract base class for Boom template
     profiles. The ``BoomProfile`` class cannot be instantiated by
@@ -491,6 +547,10 @@ class BoomProfile(object):
     _unwritten = False
     #: Comment descriptors read from on-disk store
     _comments = None
+    #: Compiled format regex lists keyed by format string and templates
+    _regex_cache = None
+    #: Generation counter for dirty detection
+    generation = 0
 
     #: Key set for this profile class
     _profile_keys = None
@@ -633,6 +693,7 @@ class BoomProfile(object):
             # it will be re-set to the previous value on next access.
             self._profile_data.pop(self._identity_key)
         self._unwritten = True
+        self.generation += 1
 
     def _generate_id(self):
         """Generate a new profile identifier.
@@ -676,7 +737,7 @@ class BoomProfile(object):
         comment = ""
         ptype = self.__class__.__name__
 
-        _log_debug("Loading %s from '%s'" % (ptype, basename(profile_file)))
+        _log_debug("Loading %s from '%s'", ptype, basename(profile_file))
         with open(profile_file, "r") as pf:
             for line in pf:
                 if blank_or_comment(line):
@@ -728,7 +789,7 @@ class BoomProfile(object):
         :rtype: bool
         """
         _log_debug_profile(
-            "Matching uname pattern '%s' to '%s'" % (self.uname_pattern, version)
+            "Matching uname pattern '%s' to '%s'", self.uname_pattern, version
         )
         if self.uname_pattern and version:
             if re.search(self.uname_pattern, version):
@@ -752,21 +813,25 @@ class BoomProfile(object):
         """
         # Attempt to match a distribution-formatted options line
 
-        if not self.options or not entry.options:
+        entry_options = entry.options
+        if not self.options or not entry_options:
             return False
 
-        opts_regex_words = self.make_format_regexes(self.options)
+        opts_regex_words = self.compiled_format_regexes(self.options)
         _log_debug_profile(
-            "Matching options regex list with %d entries" % len(opts_regex_words)
+            "Matching options regex list with %d entries", len(opts_regex_words)
         )
 
         format_opts = []
         fixed_opts = []
+        words = entry_options.split()
 
         for rgx_word in opts_regex_words:
-            for word in entry.options.split():
-                (name, exp) = rgx_word
-                match = re.match(exp, word)
+            (name, exp, rgx, literal) = rgx_word
+            for word in words:
+                if literal not in word:
+                    continue
+                match = rgx.match(word)
                 if not match:
                     continue
                 value = match.group(0)
@@ -890,6 +955,34 @@ class BoomProfile(object):
 
         return regex_words
 
+    def compiled_format_regexes(self, fmt):
+        """Generate compiled regexes matching format string
+
+        Return a tuple of ``(key, expr, regex, literal)`` tuples, where
+        ``key`` and ``expr`` are the values returned by
+        ``make_format_regexes()``, ``regex`` is the compiled form
+        of ``expr``, and ``literal`` is a string that any word matching
+        ``regex`` must contain (or the empty string).
+
+        Results are cached on the profile, keyed by the format string
+        and the root option templates that it may expand to, so that
+        matching many entries against the same profile builds the
+        expression list only once. Compiled expressions are shared
+        between profiles that produce the same expression list.
+
+        :param fmt: The format string to build a regex list from.
+        :returns: A tuple of key, word regex, compiled regex and literal
+                  tuples.
+        :rtype: tuple of (str, str, re.Pattern, str)
+        """
+        if self._regex_cache is None:
+            self._regex_cache = {}
+        cache_key = (fmt, self.root_opts_lvm2, self.root_opts_btrfs)
+        if cache_key not in self._regex_cache:
+            regex_words = tuple(self.make_format_regexes(fmt))
+            self._regex_cache[cache_key] = _compile_regex_words(regex_words)
+        return self._regex_cache[cache_key]
+
     # We use properties for the BoomProfile attributes: this is to
     # allow the values to be stored in a dictionary. Although
     # properties are quite verbose this reduces the code volume
@@ -1188,7 +1281,7 @@ class BoomProfile(object):
                 _log_error("Error unlinking temporary path %s" % tmp_path)
             raise e
 
-        _log_debug("Wrote %s (id=%s)'" % (ptype, profile_id))
+        _log_debug("Wrote %s (id=%s)'", ptype, profile_id)
 
     def write_profile(self, force=False):
         """Write out profile data to disk.
@@ -1235,7 +1328,7 @@ class BoomProfile(object):
             return
         try:
             unlink(profile_path)
-            _log_debug("Deleted %s(id='%s')" % (ptype, profile_id))
+            _log_debug("Deleted %s(id='%s')", ptype, profile_id)
         except Exception as e:
             _log_error("Error removing %s file '%s': %s" % (ptype, profile_path, e))
 
@@ -1427,7 +1520,7 @@ class OsProfile(BoomProfile):
         comment = ""
         ptype = self.__class__.__name__
 
-        _log_debug("Loading %s from '%s'" % (ptype, basename(profile_file)))
+        _log_debug("Loading %s from '%s'", ptype, basename(profile_file))
         with open(profile_file, "r") as pf:
             for line in pf:
                 if blank_or_comment(line):
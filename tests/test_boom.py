@@ -16,7 +16,8 @@ import unittest
 import logging
 import boom
 from sys import stdout
-from os.path import abspath
+from os import stat
+from os.path import abspath, join
 
 from tests import *
 
@@ -132,6 +133,34 @@ class BoomTests(unittest.TestCase):
         self.assertTrue(boom.blank_or_comment("# this is a comment"))
         self.assertFalse(boom.blank_or_comment("THIS_IS_NOT=foo"))
 
+    def test__list_profile_files(self):
+        from boom._boom import _list_profile_files
+        profiles_path = join(BOOT_ROOT_TEST, "boom/profiles")
+        mtime = stat(profiles_path).st_mtime_ns
+        pfs = _list_profile_files(profiles_path, "profile", mtime)
+        self.assertTrue(pfs)
+        self.assertTrue(all(pf.endswith(".profile") for pf in pfs))
+        # An unchanged mtime returns the cached listing
+        self.assertIs(pfs, _list_profile_files(profiles_path, "profile", mtime))
+
+    def test_find_minimum_sha_prefix(self):
+        shas = set(["abcdef01", "abcdef02", "abc01234", "f0000000"])
+        self.assertEqual(boom.find_minimum_sha_prefix(shas, 3), 8)
+        self.assertEqual(boom.find_minimum_sha_prefix(set(["a1", "b2"]), 1), 1)
+        self.assertEqual(boom.find_minimum_sha_prefix(set(), 7), 7)
+
+    def test_min_id_widths(self):
+        class Ids(object):
+            def __init__(self, a, b):
+                self.a = a
+                self.b = b
+
+        objs = [Ids("aaaa1", "b1"), Ids("aaaa2", "c2")]
+        widths = boom.min_id_widths(2, objs, ["a", "b"])
+        self.assertEqual(widths, {"a": 5, "b": 2})
+        self.assertEqual(boom.min_id_width(2, objs, "a"), 5)
+        self.assertEqual(boom.min_id_widths(2, [], ["a"]), {"a": 2})
+
     def test_set_debug_mask(self):
         boom.set_debug_mask(boom.BOOM_DEBUG_ALL)
 
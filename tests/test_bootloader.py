@@ -14,7 +14,7 @@
 import unittest
 import logging
 from sys import stdout
-from os import listdir, makedirs, mknod, unlink
+from os import chmod, listdir, makedirs, mknod, stat, unlink
 from os.path import abspath, exists, join
 from stat import S_IFBLK, S_IFCHR
 import shutil
@@ -53,6 +53,22 @@ class BootParamsTests(unittest.TestCase):
                             btrfs_subvol_path="/snapshots/snap-1",
                             btrfs_subvol_id="232")
 
+    def test_BootParams_generation(self):
+        bp = BootParams("1.1.1.x86_64", root_device="/dev/sda5",
+                        add_opts=["debug"])
+        generation = bp.generation
+        # Assigning an unchanged value is not a modification
+        bp.root_device = "/dev/sda5"
+        bp.add_opts = ["debug"]
+        self.assertEqual(bp.generation, generation)
+        bp.root_device = "/dev/sda6"
+        self.assertNotEqual(bp.generation, generation)
+        # A list modified in place is a change when it is assigned again
+        generation = bp.generation
+        bp.add_opts.append("quiet")
+        bp.add_opts = bp.add_opts
+        self.assertNotEqual(bp.generation, generation)
+
     def test_BootParams_plain__str__and__repr__(self):
         # Plain root_device
         bp = BootParams(version="1.1.1.x86_64", root_device="/dev/sda5")
@@ -233,6 +249,13 @@ class BootEntryBasicTests(unittest.TestCase):
                  '"40c7c3158e626ed25cc2066b7c308fca0cb57be2"})')
         self.assertEqual(repr(be), xrepr)
 
+    def test__BLS_KEY_MAP(self):
+        from boom.bootloader import _BLS_KEY_MAP
+        self.assertEqual(_BLS_KEY_MAP["machine-id"], BOOM_ENTRY_MACHINE_ID)
+        self.assertEqual(_BLS_KEY_MAP["grub_users"], BOOM_ENTRY_GRUB_USERS)
+        self.assertEqual(_BLS_KEY_MAP["id"], BOOM_ENTRY_GRUB_ID)
+        self.assertNotIn("machine_id", _BLS_KEY_MAP)
+
     def test_BootEntry(self):
         # Test BootEntry init from kwargs
         with self.assertRaises(ValueError) as cm:
@@ -500,6 +523,103 @@ class BootEntryTests(unittest.TestCase):
         # Profile and entry are non-persistent
         be2.delete_entry()
 
+    def test_BootEntry_format_after_modify(self):
+        be = self.test_be
+        self.assertEqual(be.linux, "/vmlinuz-1.1.1.fc24")
+        self.assertEqual(be.options, "root=/dev/vg/lv rd.lvm.lv=vg/lv rhgb quiet")
+        # Modifying the attached OsProfile or BootParams must be reflected
+        # in formatted values.
+        self.test_osp.kernel_pattern = "/kernel-%{version}"
+        self.assertEqual(be.linux, "/kernel-1.1.1.fc24")
+        self.test_osp.root_opts_lvm2 = "rd.lvm.lv=%{lvm_root_lv} ro"
+        self.assertEqual(be.options, "root=/dev/vg/lv rd.lvm.lv=vg/lv ro rhgb quiet")
+        self.test_bp.lvm_root_lv = "vg/lv2"
+        self.assertEqual(be.options, "root=/dev/vg/lv rd.lvm.lv=vg/lv2 ro rhgb quiet")
+        be.bp = BootParams("2.2.2.fc24", root_device="/dev/sda1")
+        self.assertEqual(be.linux, "/kernel-2.2.2.fc24")
+        self.assertEqual(be.options, "root=/dev/sda1 rhgb quiet")
+        be.bp.add_opts = ["debug"]
+        be.bp.del_opts = ["quiet"]
+        self.assertEqual(be.options, "root=/dev/sda1 rhgb debug")
+        be.options = "root=/dev/sda2 quiet"
+        self.assertEqual(be.options, "root=/dev/sda2 debug")
+
+    def test_BootEntry_boot_id_after_profile_modify(self):
+        be = self.test_be
+        boot_id = be.boot_id
+        self.test_osp.kernel_pattern = "/kernel-%{version}"
+        self.assertEqual(be.linux, "/kernel-1.1.1.fc24")
+        self.assertNotEqual(be.boot_id, boot_id)
+        self.assertIn(be.boot_id[0:7], be._entry_path)
+
+    def test_BootEntry_write_unchanged(self):
+        osp = find_profiles(Selection(os_id="d4439b7"))[0]
+        bp = BootParams("1.1.1-1.fc26", root_device="/dev/vg00/lvol0",
+                        lvm_root_lv="vg00/lvol0")
+        be = BootEntry(title="title", machine_id="ffffffff", boot_params=bp,
+                       osprofile=osp, allow_no_dev=True)
+        be.write_entry()
+        ino = stat(be.entry_path).st_ino
+        self.assertEqual(stat(be.entry_path).st_mode & 0o777, BOOT_ENTRY_MODE)
+
+        # Setting an identical value does not rewrite the entry file
+        be.title = "title"
+        be.write_entry()
+        self.assertEqual(stat(be.entry_path).st_ino, ino)
+
+        # An unchanged entry file with the wrong mode is corrected
+        chmod(be.entry_path, 0o600)
+        be.title = "title"
+        be.write_entry()
+        self.assertEqual(stat(be.entry_path).st_ino, ino)
+        self.assertEqual(stat(be.entry_path).st_mode & 0o777, BOOT_ENTRY_MODE)
+
+        # A forced write always replaces the file
+        be.write_entry(force=True)
+        self.assertNotEqual(stat(be.entry_path).st_ino, ino)
+        be.delete_entry()
+
+    def test_BootEntry_from_file_form_feed(self):
+        # Only newlines end an entry line
+        bp = BootParams("1.1.1.fc24", root_device="/dev/sda5")
+        be = BootEntry(title="a\x0cb", machine_id="ffffffff", boot_params=bp,
+                       allow_no_dev=True)
+        be.write_entry()
+        be2 = BootEntry(entry_file=be.entry_path)
+        self.assertEqual(be2.title, "a\x0cb")
+        be.delete_entry()
+
+    def test_BootEntry_from_file_comments(self):
+        entry_path = join(boom_entries_path(), "comments.conf")
+        with open(entry_path, "w") as f:
+            f.write("# First comment\n"
+                    "title Comments\n"
+                    "\n"
+                    "# Second comment\n"
+                    "version 1.1.1\n"
+                    "linux /vmlinuz-1.1.1\n"
+                    "options root=/dev/sda5 ro\n")
+        be = BootEntry(entry_file=entry_path)
+        unlink(entry_path)
+        self.assertEqual(be.title, "Comments")
+        self.assertEqual(be.linux, "/vmlinuz-1.1.1")
+        self.assertTrue(be.read_only)
+
+    def test_BootEntry_from_file_os_id_comment(self):
+        osp = find_profiles(Selection(os_id="d4439b7"))[0]
+        entry_path = join(boom_entries_path(), "os_id_comment.conf")
+        with open(entry_path, "w") as f:
+            f.write("#OsIdentifier: %s\n"
+                    "# Another comment\n"
+                    "title OsIdentifier\n"
+                    "version 1.1.1\n"
+                    "linux /vmlinuz-1.1.1\n"
+                    "options root=/dev/sda5 ro\n" % osp.os_id)
+        be = BootEntry(entry_file=entry_path)
+        unlink(entry_path)
+        self.assertEqual(be._osp, osp)
+        self.assertEqual(be._comments, {BOOM_ENTRY_TITLE: "# Another comment\n"})
+
     def test_BootEntry_profile_kernel_version(self):
         osp = self.test_osp
         be = BootEntry(title="title", machine_id="ffffffff", osprofile=osp)
@@ -543,6 +663,18 @@ class BootEntryTests(unittest.TestCase):
                        allow_no_dev=True)
         self.assertEqual(xboot_id, be.boot_id)
 
+    def test_BootEntry_boot_id_cache_invalidated(self):
+        bp = BootParams("1.1.1.x86_64", root_device="/dev/sda5")
+        be = BootEntry(title="title", machine_id="ffffffff", boot_params=bp,
+                       allow_no_dev=True)
+        boot_id = be.boot_id
+        self.assertIs(boot_id, be.boot_id)
+        be.title = "newtitle"
+        self.assertNotEqual(boot_id, be.boot_id)
+        boot_id = be.boot_id
+        bp.root_device = "/dev/sda6"
+        self.assertNotEqual(boot_id, be.boot_id)
+
     def test_BootEntry_root_opts_no_values(self):
         from boom.bootloader import (
             BOOM_ENTRY_TITLE, BOOM_ENTRY_MACHINE_ID, BOOM_ENTRY_VERSION,
@@ -623,9 +755,16 @@ class BootEntryTests(unittest.TestCase):
         self.assertEqual(be.options, "root=/dev/vg00/lvol0 "
                          "rd.lvm.lv=vg00/lvol0 rhgb quiet")
 
+        be.write_entry()
+        self.assertFalse(be._unwritten)
         be.grub_users = "test_user"
+        self.assertTrue(be._unwritten)
         be.grub_arg = "--test-arg"
         be.grub_class = "test_class"
+        self.assertIn(BOOM_ENTRY_GRUB_CLASS, be.keys())
+        be.update_entry()
+        self.assertFalse(be._unwritten)
+        be.delete_entry()
 
     def test_BootEntry_optional_keys_not_set(self):
         osp = self.test_osp
@@ -752,6 +891,27 @@ class BootEntryTests(unittest.TestCase):
 
         self.assertEqual(be.keys(), xkeys)
 
+    def test_BootEntry_keys_after_set(self):
+        bp = BootParams("4.11.5-100.fc24.x86_64", root_device="/dev/sda5")
+        be = BootEntry(title="title", machine_id="ffffffff", boot_params=bp,
+                       allow_no_dev=True)
+        self.assertNotIn(BOOM_ENTRY_EFI, be.keys())
+        be.efi = "/EFI/fedora/shim.efi"
+        self.assertIn(BOOM_ENTRY_EFI, be.keys())
+        self.assertIn("/EFI/fedora/shim.efi", be.values())
+
+    def test_BootEntry_entry_path_after_set(self):
+        bp = BootParams("4.11.5-100.fc24.x86_64", root_device="/dev/sda5")
+        be = BootEntry(title="title", machine_id="ffffffff", boot_params=bp,
+                       allow_no_dev=True)
+        path = be.entry_path
+        self.assertIn(be.boot_id[0:7], path)
+        be.title = "new title"
+        self.assertNotEqual(be.entry_path, path)
+        self.assertIn(be.boot_id[0:7], be.entry_path)
+        bp.version = "4.11.6-100.fc24.x86_64"
+        self.assertIn("4.11.6-100.fc24.x86_64", be.entry_path)
+
     def test_BootEntry_values(self):
         from boom.osprofile import OsProfile, load_profiles
         load_profiles()
@@ -829,6 +989,32 @@ class BootEntryTests(unittest.TestCase):
         boom.bootloader._del_entry(be)
         self.assertFalse(be in boom.bootloader._entries)
 
+    def test_min_boot_id_width(self):
+        from boom import min_id_width
+        boom.bootloader.load_entries()
+        entries = boom.bootloader._entries
+        xwidth = min_id_width(7, entries, "boot_id")
+        self.assertEqual(min_boot_id_width(), xwidth)
+        # Repeated calls reuse the width cached for this generation
+        generation = boom.bootloader._entries_generation
+        self.assertEqual(min_boot_id_width(), xwidth)
+        self.assertEqual(boom.bootloader._entries_generation, generation)
+        self.assertEqual(boom.bootloader._boot_id_width[0], generation)
+        # Cached width is recalculated when the set of boot_ids changes
+        be = BootEntry(title="title", machine_id="ffffffff",
+                       allow_no_dev=True)
+        boom.bootloader._add_entry(be)
+        self.assertNotEqual(boom.bootloader._entries_generation, generation)
+        self.assertEqual(min_boot_id_width(),
+                         min_id_width(7, entries, "boot_id"))
+        generation = boom.bootloader._entries_generation
+        be.title = "new title"
+        self.assertNotEqual(boom.bootloader._entries_generation, generation)
+        self.assertEqual(min_boot_id_width(),
+                         min_id_width(7, entries, "boot_id"))
+        boom.bootloader._del_entry(be)
+        self.assertEqual(min_boot_id_width(), xwidth)
+
     def test_load_entries_loads_profiles(self):
         import boom.osprofile
         boom.osprofile._profiles = []
@@ -845,6 +1031,20 @@ class BootEntryTests(unittest.TestCase):
         self.assertTrue(boom.osprofile._profiles)
         self.assertTrue(boom.bootloader._entries)
 
+    def test_find_entries_profile_only_selection(self):
+        for select in (Selection(), Selection(allow_null=True)):
+            bes = boom.bootloader.find_entries(select)
+            xbes = [be for be in boom.bootloader._entries
+                    if boom.bootloader.select_entry(select, be)]
+            self.assertEqual(bes, xbes)
+
+    def test_find_entries_no_reload_if_empty(self):
+        # Entries loaded from an empty directory are not reloaded
+        boom.bootloader._entries = []
+        self.assertEqual(boom.bootloader.find_entries(), [])
+        drop_entries()
+        self.assertTrue(boom.bootloader.find_entries())
+
     def test_find_entries_by_boot_id(self):
         boot_id = "12a2696bf85cc33f42f0449fab5da64dac7aa10a"
         boom.bootloader._entries = None
@@ -962,10 +1162,32 @@ class BootEntryTests(unittest.TestCase):
         xstr = str(be)
         self.assertEqual(xstr, be.expanded())
 
+    def test_grub2_env_cached(self):
+        import boom.bootloader as bootloader
+        drop_entries()
+        self.assertIsNone(bootloader._grub2_env)
+        self.assertEqual(bootloader._expand_vars("x $grub_users"), "x root")
+        # Only whole-word references are expanded, each exactly once
+        self.assertEqual(bootloader._expand_vars("$grub_users $grub_users2 a=$b"),
+                         "root  a=$b")
+        # The environment is read once and kept until entries are dropped
+        self.assertEqual(bootloader._grub2_env["boot_success"], "0")
+        drop_entries()
+        self.assertIsNone(bootloader._grub2_env)
+
 class BootLoaderBasicTests(unittest.TestCase):
     def test_import(self):
         import boom.bootloader
 
+    def test_match_root_lv(self):
+        from boom.bootloader import _match_root_lv
+        self.assertTrue(_match_root_lv("/dev/vg/lv", "vg/lv"))
+        self.assertTrue(_match_root_lv("/dev/mapper/vg-lv", "vg/lv"))
+        self.assertTrue(_match_root_lv("/dev/mapper/v--g-l--v", "v--g/l--v"))
+        self.assertFalse(_match_root_lv("/dev/mapper/vg-lv", "vg/lv2"))
+        # A mapper name without a vg/lv separator does not match
+        self.assertFalse(_match_root_lv("/dev/mapper/luks--root", "luks/root"))
+
 
 class BootLoaderTests(unittest.TestCase):
     """Class for bootloader module-level tests.
@@ -1035,6 +1257,31 @@ class BootLoaderTests(unittest.TestCase):
                 entry_count += 1
         self.assertEqual(len(boom.bootloader._entries), entry_count)
 
+    def test_load_entries_skips_directories(self):
+        entry_count = len(boom.bootloader._entries or [])
+        makedirs(join(boom_entries_path(), "directory.conf"))
+        # Entry load errors are raised when debugging is enabled
+        boom.set_debug_mask(boom.BOOM_DEBUG_ALL)
+        try:
+            boom.bootloader.load_entries()
+        finally:
+            boom.set_debug_mask(0)
+        self.assertEqual(len(boom.bootloader._entries), entry_count)
+
+    def test_load_entries_renames_mismatched_entry(self):
+        bp = BootParams("1.1.1.fc24", root_device="/dev/sda5")
+        be = BootEntry(title="title", machine_id="ffffffff", boot_params=bp,
+                       allow_no_dev=True)
+        be.write_entry()
+        boot_id = be.boot_id
+        # Move the entry to a file name that does not match its boot_id
+        bad_path = join(boom_entries_path(), "ffffffff-1234567-1.1.1.fc24.conf")
+        shutil.move(be._entry_path, bad_path)
+        boom.bootloader.load_entries()
+        ids = [e.boot_id for e in boom.bootloader._entries]
+        self.assertEqual(ids.count(boot_id), 1)
+        self.assertFalse(exists(bad_path))
+
     def test_load_entries_with_machine_id(self):
         # Test that loading the test entries by machine_id succeeds,
         # and returns the expected number of profiles.
@@ -225,6 +225,30 @@ class OsProfileTests(unittest.TestCase):
 
         self.assertEqual(osp.root_opts_btrfs, "rootflags=%{btrfs_subvolume}")
 
+    def test_OsProfile_compiled_format_regexes(self):
+        osp = OsProfile(name="Regex", short_name="regex",
+                        version="1 (Server)", version_id="1")
+        osp.root_opts_lvm2 = "rd.lvm.lv=%{lvm_root_lv}"
+        osp.root_opts_btrfs = "rootflags=%{btrfs_subvolume}"
+        fmt = "root=%{root_device} ro %{root_opts}"
+        rgxs = osp.compiled_format_regexes(fmt)
+        self.assertEqual([r[0:2] for r in rgxs],
+                         osp.make_format_regexes(fmt))
+        self.assertTrue(rgxs[0][2].match("root=/dev/sda5"))
+        # Words without the literal prefix cannot match
+        self.assertEqual(rgxs[0][3], "root=")
+        self.assertEqual(rgxs[1][3], "ro")
+        # Cached until the root option templates change
+        self.assertIs(rgxs, osp.compiled_format_regexes(fmt))
+        # Compiled expressions are shared with profiles using the same templates
+        osp2 = OsProfile(name="Regex2", short_name="regex2",
+                         version="2 (Server)", version_id="2")
+        osp2.root_opts_lvm2 = osp.root_opts_lvm2
+        osp2.root_opts_btrfs = osp.root_opts_btrfs
+        self.assertIs(rgxs, osp2.compiled_format_regexes(fmt))
+        osp.root_opts_lvm2 = "rd.lvm.lv=%{lvm_root_lv} lvm"
+        self.assertIsNot(rgxs, osp.compiled_format_regexes(fmt))
+
     def test_OsProfile_from_os_release(self):
         osp = OsProfile.from_os_release([
             '# Fedora 24 Workstation Edition\n',